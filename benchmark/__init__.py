@@ -0,0 +1,6 @@
+"""
+Benchmarks of dbfxsql on synthetic DBF and SQLite tables.
+
+    python -m benchmark run -r 100000 -m CNDLM -w migrate -o base.json
+    python -m benchmark compare base.json head.json
+"""
@@ -0,0 +1,160 @@
+import json
+import sys
+import tempfile
+
+import click
+
+from . import generators, results, runner, workloads
+
+
+@click.group()
+@click.help_option("-h", "--help")
+def benchmark() -> None:
+    """Time dbfxsql on synthetic tables and compare the results between runs."""
+
+
+@benchmark.command()
+@click.option(
+    "-w",
+    "--workload",
+    "names",
+    type=click.Choice(list(workloads.WORKLOADS)),
+    multiple=True,
+    help="[default: all of them]",
+)
+@click.option(
+    "-r",
+    "--rows",
+    type=click.IntRange(min=1),
+    default=10_000,
+    show_default=True,
+)
+@click.option(
+    "-m",
+    "--mix",
+    default="CNDL",
+    show_default=True,
+    help="Types of the fields after the key, one letter each: C, N, D, L or M.",
+)
+@click.option(
+    "-n",
+    "--operations",
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Operations of each kind timed by crud.",
+)
+@click.option(
+    "-c",
+    "--change-rate",
+    type=click.FloatRange(min=0, max=1, min_open=True),
+    default=0.01,
+    show_default=True,
+    help="Share of the rows changed by each round of sync.",
+)
+@click.option(
+    "--rounds",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Rounds of changes timed by sync.",
+)
+@click.option(
+    "-q",
+    "--quiet-period",
+    type=click.FloatRange(min=0),
+    default=0.05,
+    show_default=True,
+    help="Seconds sync waits for a file to settle.",
+)
+@click.option(
+    "-p",
+    "--pack-threshold",
+    type=click.FloatRange(min=0, max=1),
+    default=0.2,
+    show_default=True,
+    help="Share of deleted DBF records tolerated before a delete packs the table.",
+)
+@click.option(
+    "-i",
+    "--index",
+    is_flag=True,
+    help="Index the key of the DBF table timed by crud.",
+)
+@click.option("-s", "--seed", type=int, default=0, show_default=True)
+@click.option(
+    "-d",
+    "--folder",
+    type=click.Path(exists=True, file_okay=False),
+    default=tempfile.gettempdir(),
+    show_default=True,
+    help="Folder the tables are written in.",
+)
+@click.option(
+    "-o",
+    "--output",
+    help="JSON file for the results.  [default: stdout]",
+    default="",
+)
+@click.help_option("-h", "--help")
+def run(names: tuple, output: str, **parameters: any) -> None:
+    """Run workloads, each in a new process, and report their metrics."""
+
+    parameters["mix"] = parameters["mix"].upper()
+
+    if unknown := set(parameters["mix"]) - set(generators.FIELD_TYPES):
+        raise click.BadParameter(
+            f"Unknown field types: {", ".join(sorted(unknown))}.", param_hint="'-m'"
+        )
+
+    report: dict = runner.run(list(names or workloads.WORKLOADS), parameters)
+
+    if output:
+        results.save(report, output)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+@benchmark.command()
+@click.argument("base", type=click.Path(exists=True, dir_okay=False))
+@click.argument("head", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-t",
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=0.1,
+    show_default=True,
+    help="Relative change past which a worse metric is a regression.",
+)
+@click.help_option("-h", "--help")
+def compare(base: str, head: str, threshold: float) -> None:
+    """Compare the metrics of two runs, failing if any of them regressed."""
+
+    from prettytable import PrettyTable
+
+    rows: list[dict] = results.compare(
+        results.load(base), results.load(head), threshold
+    )
+
+    table = PrettyTable(["metric", "base", "head", "change", ""], align="r")
+    table.align["metric"] = "l"
+
+    for row in rows:
+        table.add_row(
+            [
+                row["metric"],
+                f"{row["base"]:.4g}",
+                f"{row["head"]:.4g}",
+                f"{row["change"]:+.1%}",
+                "REGRESSION" if row["regression"] else "",
+            ]
+        )
+
+    print(table)
+
+    if regressions := sum(row["regression"] for row in rows):
+        sys.exit(f"{regressions} metrics regressed more than {threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    benchmark()
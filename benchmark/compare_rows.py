@@ -0,0 +1,62 @@
+"""Scaling of the row diff used by migrate, with: python -m benchmark.compare_rows"""
+
+import random
+import time
+
+from dbfxsql.helpers import formatters
+from dbfxsql.models.sync_table import SyncTable
+
+
+SIZES: tuple[int, ...] = (1_000, 10_000, 100_000, 1_000_000)
+CHANGE_RATE: float = 0.01
+
+
+def generate_rows(size: int, fields: list[str]) -> list[dict]:
+    return [{fields[0]: index, fields[1]: f"name {index}"} for index in range(size)]
+
+
+def mutate_rows(rows: list[dict], fields: list[str], rate: float) -> list[dict]:
+    """Returns a shuffled copy of the rows with a fraction of them modified."""
+
+    rows = [dict(row) for row in rows]
+
+    for row in random.sample(rows, int(len(rows) * rate)):
+        row[fields[1]] += " (changed)"
+
+    random.shuffle(rows)
+
+    return rows
+
+
+def run(size: int) -> float:
+    origin_fields: list[str] = ["id", "name"]
+    destiny_fields: list[str] = ["code", "fullname"]
+
+    origin_rows: list[dict] = generate_rows(size, origin_fields)
+    destiny_rows: list[dict] = mutate_rows(
+        generate_rows(size, destiny_fields), destiny_fields, CHANGE_RATE
+    )
+
+    origin: SyncTable = SyncTable("DBF", "users.dbf", "", [origin_fields], origin_rows)
+    destiny: SyncTable = SyncTable("SQL", "company.sql", "users", destiny_fields, destiny_rows)
+
+    start: float = time.perf_counter()
+
+    residual_tables: list = formatters.compare_tables(origin, [destiny])
+    formatters.classify_operations(residual_tables)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    random.seed(0)
+
+    print(f"{'rows':>10} {'seconds':>10} {'rows/s':>12}")
+
+    for size in SIZES:
+        elapsed: float = run(size)
+        print(f"{size:>10} {elapsed:>10.3f} {size / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Synthetic DBF and SQLite tables, and batches of changes to them"""
+
+import datetime
+import os
+import random
+from collections.abc import Generator
+
+import tomli_w
+
+from dbfxsql.constants import config
+from dbfxsql.modules import dbf_controller, sql_controller
+
+
+# DBF and SQL types of each letter of a field mix
+FIELD_TYPES: dict[str, tuple[str, str]] = {
+    "C": ("C(30)", "TEXT"),
+    "N": ("N(10,0)", "INTEGER"),
+    "D": ("D", "TEXT"),
+    "L": ("L", "INTEGER"),
+    "M": ("M", "TEXT"),
+}
+
+# every table is led by a numeric key, numbered from 1
+KEY: str = "id"
+KEY_TYPES: tuple[str, str] = ("N(10,0)", "INTEGER PRIMARY KEY")
+
+DBF_SOURCE: str = "bench.dbf"
+SQL_SOURCE: str = "bench.sql"
+SQL_TABLE: str = "bench"
+
+BATCH_SIZE: int = 10_000
+EPOCH: datetime.date = datetime.date(2000, 1, 1)
+
+
+def field_names(mix: str) -> list[str]:
+    """Names the fields of a mix after their letter and place, like c1 or n2."""
+
+    return [KEY] + [f"{letter.lower()}{index}" for index, letter in enumerate(mix, 1)]
+
+
+def create_table(engine: str, mix: str, rows: int, seed: int) -> None:
+    """Creates the benchmark table of an engine, filled with seeded rows."""
+
+    names: list[str] = field_names(mix)
+    column: int = 0 if "DBF" == engine else 1
+
+    fields: list[tuple[str, str]] = [(KEY, KEY_TYPES[column])] + [
+        (name, FIELD_TYPES[letter][column]) for name, letter in zip(names[1:], mix)
+    ]
+
+    generated: Generator[dict] = generate_rows(engine, mix, 1, rows, seed)
+
+    if "DBF" == engine:
+        dbf_controller.create_table(engine, DBF_SOURCE, fields)
+        batches: Generator = dbf_controller.import_rows(
+            engine, DBF_SOURCE, generated, BATCH_SIZE
+        )
+    else:
+        sql_controller.create_table(engine, SQL_SOURCE, SQL_TABLE, fields)
+        batches: Generator = sql_controller.import_rows(
+            engine, SQL_SOURCE, SQL_TABLE, generated, BATCH_SIZE
+        )
+
+    for _ in batches:
+        pass
+
+
+def generate_rows(
+    engine: str, mix: str, first: int, count: int, seed: int
+) -> Generator[dict]:
+    """
+    Yields rows keyed from a first number, with the values of each one drawn
+    from a generator seeded by its key, so any engine gets the same rows.
+    """
+
+    names: list[str] = field_names(mix)
+
+    for key in range(first, first + count):
+        generator: random.Random = random.Random(seed * 1_000_003 + key)
+        values: list = [_value(generator, letter, engine) for letter in mix]
+
+        yield dict(zip(names, [key, *values]))
+
+
+def change_batch(
+    mix: str, keys: list[int], size: int, first: int, generator: random.Random
+) -> tuple[list[dict], list[tuple[dict, dict]], list[dict]]:
+    """
+    Draws a batch of changes to a DBF table split between inserts, updates and
+    deletes of its live keys, with the inserted keys numbered from first.
+    """
+
+    names: list[str] = field_names(mix)
+
+    count: int = max(size // 3, 1)
+    touched: list[int] = generator.sample(keys, min(len(keys), size - count))
+    half: int = len(touched) // 2
+
+    seed: int = generator.getrandbits(32)
+    inserts: list[dict] = list(generate_rows("DBF", mix, first, count, seed))
+
+    updates: list[tuple[dict, dict]] = [
+        ({KEY: key}, dict(zip(names[1:], row)))
+        for key, row in zip(touched[:half], _values(mix, half, generator))
+    ]
+
+    deletes: list[dict] = [{KEY: key} for key in touched[half:]]
+
+    return inserts, updates, deletes
+
+
+def write_config(mix: str, quiet_period: float, pack_threshold: float) -> None:
+    """Writes a config syncing the DBF table with the SQL one by their key."""
+
+    names: list[str] = field_names(mix)
+    configpath: str = os.path.expanduser(config.PATH)
+
+    settings: dict = {
+        "folderpaths": {"DBF": ["."], "SQL": ["."]},
+        "extensions": {"DBF": [".dbf", ".DBF"], "SQL": [".sql", ".SQL"]},
+        "dbf": {**config.DBF, "pack_threshold": pack_threshold},
+        "sqlite": config.SQLITE,
+        "sync": {**config.SYNC, "quiet_period": quiet_period},
+        "relations": [
+            {
+                "sources": [DBF_SOURCE, SQL_SOURCE],
+                "tables": ["", SQL_TABLE],
+                "fields": [names, names],
+                "keys": [[KEY], [KEY]],
+            }
+        ],
+    }
+
+    os.makedirs(os.path.dirname(configpath), exist_ok=True)
+
+    with open(configpath, "wb") as configfile:
+        tomli_w.dump(settings, configfile)
+
+
+def _values(mix: str, count: int, generator: random.Random) -> Generator[list]:
+    for _ in range(count):
+        yield [_value(generator, letter, "DBF") for letter in mix]
+
+
+def _value(generator: random.Random, letter: str, engine: str) -> any:
+    """Draws a value of a field, typed as the engine stores it."""
+
+    if "C" == letter:
+        return f"{generator.getrandbits(48):012x}"
+
+    if "N" == letter:
+        return generator.randrange(1_000_000)
+
+    if "D" == letter:
+        date: datetime.date = EPOCH + datetime.timedelta(generator.randrange(9_000))
+        return date if "DBF" == engine else date.isoformat()
+
+    if "L" == letter:
+        flag: bool = generator.random() < 0.5
+        return flag if "DBF" == engine else int(flag)
+
+    # memos long enough to span several blocks of the memo file
+    return " ".join(f"{generator.getrandbits(32):08x}" for _ in range(40))
@@ -0,0 +1,100 @@
+"""Summaries of timed runs, saved as JSON and compared between runs"""
+
+import json
+import math
+
+
+# suffixes of the metrics where a lower value is an improvement
+LOWER_IS_BETTER: tuple[str, ...] = ("_ms", "_seconds", "_kb")
+HIGHER_IS_BETTER: tuple[str, ...] = ("_per_s",)
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+
+    ordered: list[float] = sorted(values)
+    rank: int = max(math.ceil(share * len(ordered)), 1)
+
+    return ordered[rank - 1]
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    """Rate and latency percentiles of operations timed one by one, in seconds."""
+
+    elapsed: float = sum(latencies)
+
+    return {
+        "count": len(latencies),
+        "ops_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def save(report: dict, output: str) -> None:
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+
+
+def load(filepath: str) -> dict:
+    with open(filepath) as file:
+        return json.load(file)
+
+
+def compare(base: dict, head: dict, threshold: float) -> list[dict]:
+    """
+    Pairs the metrics two reports share, with the relative change from the
+    base to the head, and flags the ones that got worse past a threshold.
+    """
+
+    base_metrics: dict[str, float] = flatten(base["results"])
+    head_metrics: dict[str, float] = flatten(head["results"])
+
+    rows: list[dict] = []
+
+    for metric in base_metrics.keys() & head_metrics.keys():
+        if not (direction := _direction(metric)):
+            continue
+
+        before, after = base_metrics[metric], head_metrics[metric]
+        change: float = (after - before) / before if before else 0.0
+
+        rows.append(
+            {
+                "metric": metric,
+                "base": before,
+                "head": after,
+                "change": change,
+                "regression": direction * change > threshold,
+            }
+        )
+
+    return sorted(rows, key=lambda row: row["metric"])
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """Names the numeric metrics of nested results by their path, like a.b.p50_ms."""
+
+    metrics: dict[str, float] = {}
+
+    for name, value in results.items():
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{prefix}{name}."))
+
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[f"{prefix}{name}"] = value
+
+    return metrics
+
+
+def _direction(metric: str) -> int:
+    """1 when a higher value is worse, -1 when it's better, 0 when it's neither."""
+
+    if metric.endswith(LOWER_IS_BETTER):
+        return 1
+
+    if metric.endswith(HIGHER_IS_BETTER):
+        return -1
+
+    return 0
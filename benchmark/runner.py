@@ -0,0 +1,84 @@
+"""Runs each workload in a fresh process of its own and gathers the report"""
+
+import datetime
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from . import workloads
+from dbfxsql.constants import config
+
+
+def run(names: list[str], parameters: dict) -> dict:
+    """
+    Runs workloads one after another, each in a new process, so none of them
+    finds the caches of another warm and their peak memory is their own.
+    """
+
+    report: dict = {"meta": _meta(parameters), "results": {}}
+    context = multiprocessing.get_context("spawn")
+
+    for name in names:
+        with ProcessPoolExecutor(1, mp_context=context) as pool:
+            report["results"][name] = pool.submit(_execute, name, parameters).result()
+
+    return report
+
+
+def _execute(name: str, parameters: dict) -> dict:
+    """Runs a workload from an empty folder, which also serves as its home."""
+
+    folder: str = tempfile.mkdtemp(prefix="dbfxsql-bench-", dir=parameters["folder"])
+
+    # the config and sync state are looked up under the home folder
+    os.environ["HOME"] = folder
+    os.chdir(folder)
+
+    try:
+        metrics: dict = workloads.WORKLOADS[name](parameters)
+
+    finally:
+        os.chdir(parameters["folder"])
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return {**metrics, "peak_rss_kb": _peak_rss()}
+
+
+def _peak_rss() -> int:
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS counts it in bytes, Linux in kilobytes
+    return peak // 1024 if "darwin" == sys.platform else peak
+
+
+def _meta(parameters: dict) -> dict:
+    return {
+        "created": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "version": config.VERSION,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+    }
+
+
+def _commit() -> str:
+    """The commit of the checkout being measured, if it's a git repository."""
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return ""
@@ -0,0 +1,293 @@
+"""Timed workloads, each run from an empty folder of its own"""
+
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager, suppress
+
+from . import generators, results
+from dbfxsql.modules import dbf_controller, sql_controller, sync_controller
+from dbfxsql.modules.dbf import dbf_queries
+
+
+# letters of the fields single-row commands can take as text, as the CLI does
+TEXT_FIELDS: str = "CNM"
+
+POLL_INTERVAL: float = 0.002
+SYNC_TIMEOUT: float = 60.0
+WATCHER_STARTUP: float = 0.5
+
+
+def crud(engine: str, parameters: dict) -> dict:
+    """
+    Times single-row inserts, point reads, updates and deletes by key through
+    the controller of an engine, on a table of the given size.
+    """
+
+    mix: str = parameters["mix"]
+    rows: int = parameters["rows"]
+    count: int = min(parameters["operations"], rows)
+    generator: random.Random = random.Random(parameters["seed"])
+
+    # deletes pack the DBF table as the config in place tells them to
+    generators.write_config(
+        mix, parameters["quiet_period"], parameters["pack_threshold"]
+    )
+    generators.create_table(engine, mix, rows, parameters["seed"])
+
+    if "DBF" == engine and parameters["index"]:
+        dbf_controller.index_fields(engine, generators.DBF_SOURCE, [generators.KEY])
+
+    fields: list[str] = [
+        name
+        for name, letter in zip(generators.field_names(mix)[1:], mix)
+        if letter in TEXT_FIELDS
+    ]
+
+    inserted: list[dict] = list(
+        generators.generate_rows("SQL", mix, rows + 1, count, parameters["seed"])
+    )
+
+    keys: list[int] = generator.sample(range(1, rows + 1), count)
+    calls: dict[str, Callable] = _crud_calls(engine)
+
+    latencies: dict[str, list[float]] = {
+        "insert": _time_each(
+            lambda row: calls["insert"](_text(row, [generators.KEY, *fields])),
+            inserted,
+        ),
+        "read": _time_each(lambda key: calls["read"](_condition(key)), keys),
+        "update": _time_each(
+            lambda row: calls["update"](_text(row, fields), _condition(row["id"])),
+            [{**row, "id": key} for row, key in zip(inserted[::-1], keys)],
+        ),
+        "delete": _time_each(lambda key: calls["delete"](_condition(key)), keys),
+    }
+
+    return {
+        operation: results.summarize(times) for operation, times in latencies.items()
+    }
+
+
+def migrate(parameters: dict) -> dict:
+    """
+    Times the first migration of a DBF table into an empty SQL one, and the
+    migration that follows, which finds nothing to change.
+    """
+
+    rows: int = parameters["rows"]
+
+    _prepare_relation(parameters)
+
+    setup: dict = sync_controller.init()
+    filenames: list[str] = sync_controller.collect_files(setup, "DBF")
+
+    start: float = time.perf_counter()
+    sync_controller.migrate(filenames, setup["relations"])
+    full: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sync_controller.migrate(filenames, setup["relations"])
+    unchanged: float = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "rows_per_s": rows / full,
+        "full_seconds": full,
+        "unchanged_seconds": unchanged,
+    }
+
+
+def sync(parameters: dict) -> dict:
+    """
+    Measures steady-state sync: rounds of changes are written to the DBF
+    table, each one right after the SQL table caught up with the previous.
+    The latency of a round runs from its write to its last change in SQL.
+    """
+
+    mix: str = parameters["mix"]
+    rows: int = parameters["rows"]
+    size: int = max(round(rows * parameters["change_rate"]), 3)
+    generator: random.Random = random.Random(parameters["seed"])
+
+    _prepare_relation(parameters)
+
+    setup: dict = sync_controller.init()
+    sync_controller.migrate(
+        sync_controller.collect_files(setup, "DBF"), setup["relations"]
+    )
+
+    keys: list[int] = list(range(1, rows + 1))
+    totals: dict[str, int] = {"insert": 0, "update": 0, "delete": 0}
+    latencies: list[float] = []
+
+    with (
+        _syncing(setup),
+        sqlite3.connect(generators.SQL_SOURCE) as connection,
+    ):
+        start: float = time.perf_counter()
+
+        for _ in range(parameters["rounds"]):
+            inserts, updates, deletes = generators.change_batch(
+                mix, keys, size, max(keys) + 1, generator
+            )
+
+            dbf_queries.execute_keyed(
+                generators.DBF_SOURCE,
+                [generators.KEY],
+                inserts,
+                updates,
+                deletes,
+                parameters["pack_threshold"],
+            )
+            written: float = time.perf_counter()
+
+            removed: set[int] = {delete[generators.KEY] for delete in deletes}
+            keys = [key for key in keys if key not in removed]
+            keys += [insert[generators.KEY] for insert in inserts]
+
+            _await_rows(connection, len(keys), max(keys))
+            latencies.append(time.perf_counter() - written)
+
+            totals["insert"] += len(inserts)
+            totals["update"] += len(updates)
+            totals["delete"] += len(deletes)
+
+        elapsed: float = time.perf_counter() - start
+
+    summary: dict = results.summarize(latencies)
+
+    return {
+        "rounds": len(latencies),
+        "changes_per_round": size,
+        "inserts_per_s": totals["insert"] / elapsed,
+        "updates_per_s": totals["update"] / elapsed,
+        "deletes_per_s": totals["delete"] / elapsed,
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+    }
+
+
+WORKLOADS: dict[str, Callable[[dict], dict]] = {
+    "crud.dbf": lambda parameters: crud("DBF", parameters),
+    "crud.sql": lambda parameters: crud("SQL", parameters),
+    "migrate": migrate,
+    "sync": sync,
+}
+
+
+def _crud_calls(engine: str) -> dict[str, Callable]:
+    source: str = generators.DBF_SOURCE if "DBF" == engine else generators.SQL_SOURCE
+
+    if "DBF" == engine:
+        return {
+            "insert": lambda fields: dbf_controller.insert_row(
+                engine, source, fields
+            ),
+            "read": lambda condition: dbf_controller.read_rows(
+                engine, source, condition
+            ),
+            "update": lambda fields, condition: dbf_controller.update_rows(
+                engine, source, fields, condition
+            ),
+            "delete": lambda condition: dbf_controller.delete_rows(
+                engine, source, condition
+            ),
+        }
+
+    table: str = generators.SQL_TABLE
+
+    return {
+        "insert": lambda fields: sql_controller.insert_row(
+            engine, source, table, fields
+        ),
+        "read": lambda condition: sql_controller.read_rows(
+            engine, source, table, condition
+        ),
+        "update": lambda fields, condition: sql_controller.update_rows(
+            engine, source, table, fields, condition
+        ),
+        "delete": lambda condition: sql_controller.delete_rows(
+            engine, source, table, condition
+        ),
+    }
+
+
+def _time_each(call: Callable[[any], None], arguments: list) -> list[float]:
+    latencies: list[float] = []
+
+    for argument in arguments:
+        start: float = time.perf_counter()
+        call(argument)
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def _text(row: dict, fields: list[str]) -> tuple[tuple[str, str], ...]:
+    """Fields of a row as the CLI passes them, as pairs of text."""
+
+    return tuple((field, str(row[field])) for field in fields)
+
+
+def _condition(key: int) -> tuple[str, str, str]:
+    return generators.KEY, "==", str(key)
+
+
+def _prepare_relation(parameters: dict) -> None:
+    """Fills the DBF table of a keyed relation whose SQL table starts empty."""
+
+    mix: str = parameters["mix"]
+
+    generators.write_config(
+        mix, parameters["quiet_period"], parameters["pack_threshold"]
+    )
+    generators.create_table("DBF", mix, parameters["rows"], parameters["seed"])
+    generators.create_table("SQL", mix, 0, parameters["seed"])
+
+
+@contextmanager
+def _syncing(setup: dict) -> Generator[None]:
+    """Runs the sync of a setup in a thread of its own while in the context."""
+
+    stop: threading.Event = threading.Event()
+
+    async def watch() -> None:
+        task: asyncio.Task = asyncio.create_task(
+            sync_controller.synchronize(setup, "DBF")
+        )
+
+        await asyncio.to_thread(stop.wait)
+        task.cancel()
+
+        with suppress(asyncio.CancelledError):
+            await task
+
+    thread: threading.Thread = threading.Thread(target=asyncio.run, args=(watch(),))
+    thread.start()
+
+    # the watcher misses the writes made before it's listening
+    time.sleep(WATCHER_STARTUP)
+
+    try:
+        yield
+
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _await_rows(connection: sqlite3.Connection, count: int, last: int) -> None:
+    """Polls the SQL table until it holds as many rows as expected, up to a key."""
+
+    query: str = f"SELECT COUNT(1), MAX({generators.KEY}) FROM {generators.SQL_TABLE}"
+    deadline: float = time.perf_counter() + SYNC_TIMEOUT
+
+    while connection.execute(query).fetchone() != (count, last):
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"SQL table didn't catch up in {SYNC_TIMEOUT}s.")
+
+        time.sleep(POLL_INTERVAL)
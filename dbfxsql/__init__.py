@@ -1,12 +1,12 @@
 """Initialization module for the application"""
 
-from .models.lazy_group import LazyGroup
+from .models.served_group import ServedGroup
 
 import click
 
 
 @click.group(
-    cls=LazyGroup,
+    cls=ServedGroup,
     import_name="dbfxsql.cli:cli",
     epilog="For more information, visit https://github.com/joelabreurojas/DBFxSQL",
 )
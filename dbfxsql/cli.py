@@ -1,11 +1,13 @@
 from .constants import config
 from .models.order_commands import OrderCommands
-from .modules import dbf_controller, sql_controller, sync_controller
-from .helpers import utils
+from . import modules
+from .helpers import exporters, importers, utils
 
 import click
-import asyncio
-from yaspin import yaspin
+import os
+import signal
+import time
+from collections.abc import Iterable
 
 
 @click.group(cls=OrderCommands)
@@ -54,13 +56,13 @@ def create(rdbms: str, source: str, table: str | None, fields: tuple) -> None:
         raise click.UsageError(f"Unknown extension for '{source}'.")
 
     if "DBF" == engine.upper():
-        dbf_controller.create_table(engine, source, fields)
+        modules.dbf_controller.create_table(engine, source, fields)
 
     elif not table:
         raise click.UsageError("Missing option '-t' / '--table'.")
 
     elif "SQLite" == rdbms:
-        sql_controller.create_table(engine, source, table, fields)
+        modules.sql_controller.create_table(engine, source, table, fields)
 
     else:
         raise NotImplementedError
@@ -104,18 +106,116 @@ def insert(rdbms: str, source: str, table: str | None, fields: tuple) -> None:
         raise click.UsageError(f"Unknown extension for '{source}'.")
 
     if "DBF" == engine.upper():
-        dbf_controller.insert_row(engine, source, fields)
+        modules.dbf_controller.insert_row(engine, source, fields)
 
     elif not table:
         raise click.UsageError("Missing option '-t' / '--table'.")
 
     elif "SQLite" == rdbms:
-        sql_controller.insert_row(engine, source, table, fields)
+        modules.sql_controller.insert_row(engine, source, table, fields)
 
     else:
         raise NotImplementedError
 
 
+@cli.command("import")
+@click.option(
+    "-r",
+    "--rdbms",
+    default="SQLite",
+    show_default=True,
+)
+@click.option(
+    "-s",
+    "--source",
+    help="Expects a file.",
+    required=True,
+)
+@click.option(
+    "-t",
+    "--table",
+    help="[required for SQL]",
+    default="",
+)
+@click.option(
+    "-i",
+    "--input",
+    "filepath",
+    help="CSV, JSON Lines or DBF file with the rows.",
+    required=True,
+)
+@click.option(
+    "-F",
+    "--format",
+    "_format",
+    type=click.Choice(importers.FORMATS, case_sensitive=False),
+    help="[default: from the input extension]",
+)
+@click.option(
+    "-b",
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=importers.BATCH_SIZE,
+    show_default=True,
+)
+@click.version_option(config.VERSION, "-v", "--version")
+@click.help_option("-h", "--help")
+@utils.embed_examples
+def import_(
+    rdbms: str,
+    source: str,
+    table: str | None,
+    filepath: str,
+    _format: str | None,
+    batch_size: int,
+) -> None:
+    """Import the rows of a file into a DBF file/SQL table."""
+
+    from yaspin import yaspin
+
+    # Use cases
+    if not (engine := utils.check_engine(source)):
+        raise click.UsageError(f"Unknown extension for '{source}'.")
+
+    if not (_format := (_format or importers.detect_format(filepath)).lower()):
+        raise click.UsageError(f"Unknown format for '{filepath}'.")
+
+    if "dbf" == _format:
+        rows: Iterable[dict] = modules.dbf_controller.stream_file(filepath)
+    else:
+        rows: Iterable[dict] = importers.read_rows(filepath, _format)
+
+    if "DBF" == engine.upper():
+        batches: Iterable[int] = modules.dbf_controller.import_rows(
+            engine, source, rows, batch_size
+        )
+
+    elif not table:
+        raise click.UsageError("Missing option '-t' / '--table'.")
+
+    elif "SQLite" == rdbms:
+        batches: Iterable[int] = modules.sql_controller.import_rows(
+            engine, source, table, rows, batch_size
+        )
+
+    else:
+        raise NotImplementedError
+
+    with yaspin(color="cyan", timer=True) as spinner:
+        spinner.text = "Importing..."
+        count, start = 0, time.perf_counter()
+
+        for size in batches:
+            count += size
+            rate: float = count / (time.perf_counter() - start)
+
+            spinner.text = f"Importing... {count} rows ({rate:.0f} rows/s)"
+
+        spinner.ok("DONE")
+
+    print(f"Imported {count} rows.")
+
+
 @cli.command()
 @click.option(
     "-r",
@@ -143,6 +243,20 @@ def insert(rdbms: str, source: str, table: str | None, fields: tuple) -> None:
     metavar="TEXT TEXT TEXT",
     help="Field, operator and value.",
 )
+@click.option(
+    "-F",
+    "--format",
+    "_format",
+    type=click.Choice(exporters.FORMATS, case_sensitive=False),
+    default="table",
+    show_default=True,
+)
+@click.option(
+    "-o",
+    "--output",
+    help="File to export the rows to, in the format of its extension by default.",
+    default="",
+)
 @click.version_option(config.VERSION, "-v", "--version")
 @click.help_option("-h", "--help")
 @utils.embed_examples
@@ -151,6 +265,8 @@ def read(
     source: str,
     table: str | None,
     condition: tuple | None,
+    _format: str,
+    output: str,
 ) -> None:
     """Read rows from a DBF file/SQL table."""
 
@@ -158,19 +274,42 @@ def read(
     if not (engine := utils.check_engine(source)):
         raise click.UsageError(f"Unknown extension for '{source}'.")
 
-    rows: list = []
+    if "DBF" != engine.upper() and not table:
+        raise click.UsageError("Missing option '-t' / '--table'.")
 
-    if "DBF" == engine.upper():
-        rows = dbf_controller.read_rows(engine, source, condition)
+    if "DBF" != engine.upper() and "SQLite" != rdbms:
+        raise NotImplementedError
 
-    elif not table:
-        raise click.UsageError("Missing option '-t' / '--table'.")
+    if output and "table" == _format.lower():
+        extension: str = os.path.splitext(output)[1].lower()
 
-    elif "SQLite" == rdbms:
-        rows = sql_controller.read_rows(engine, source, table, condition)
+        if not (_format := exporters.EXTENSIONS.get(extension, "")):
+            raise click.UsageError(
+                f"Unknown format for '{output}', choose one with '-F' / '--format'."
+            )
+
+    if "table" != _format.lower():
+        size: int = exporters.CHUNK_SIZE
+
+        if "DBF" == engine.upper():
+            types, chunks = modules.dbf_controller.read_columns(
+                engine, source, condition, size
+            )
+        else:
+            types, chunks = modules.sql_controller.read_columns(
+                engine, source, table, condition, size
+            )
+
+        exporters.export(chunks, types, _format.lower(), output)
+        return
+
+    rows: list = []
+
+    if "DBF" == engine.upper():
+        rows = modules.dbf_controller.read_rows(engine, source, condition)
 
     else:
-        raise NotImplementedError
+        rows = modules.sql_controller.read_rows(engine, source, table, condition)
 
     utils.show_table(rows)
 
@@ -228,13 +367,13 @@ def update(
         raise click.UsageError(f"Unknown extension for '{source}'.")
 
     if "DBF" == engine.upper():
-        dbf_controller.update_rows(engine, source, fields, condition)
+        modules.dbf_controller.update_rows(engine, source, fields, condition)
 
     elif not table:
         raise click.UsageError("Missing option '-t' / '--table'.")
 
     elif "SQLite" == rdbms:
-        sql_controller.update_rows(engine, source, table, fields, condition)
+        modules.sql_controller.update_rows(engine, source, table, fields, condition)
 
     else:
         raise NotImplementedError()
@@ -279,18 +418,87 @@ def delete(rdbms: str, source: str, table: str | None, condition: tuple) -> None
         raise click.UsageError(f"Unknown extension for '{source}'.")
 
     if "DBF" == engine.upper():
-        dbf_controller.delete_rows(engine, source, condition)
+        modules.dbf_controller.delete_rows(engine, source, condition)
 
     elif not table:
         raise click.UsageError("Missing option '-t' / '--table'.")
 
     elif "SQLite" == rdbms:
-        sql_controller.delete_rows(engine, source, table, condition)
+        modules.sql_controller.delete_rows(engine, source, table, condition)
 
     else:
         raise NotImplementedError()
 
 
+@cli.command()
+@click.option(
+    "-s",
+    "--source",
+    help="Expects a DBF file.",
+    required=True,
+)
+@click.version_option(config.VERSION, "-v", "--version")
+@click.help_option("-h", "--help")
+@utils.embed_examples
+def pack(source: str) -> None:
+    """Remove the rows flagged as deleted from a DBF file."""
+
+    # Use cases
+    if not (engine := utils.check_engine(source)):
+        raise click.UsageError(f"Unknown extension for '{source}'.")
+
+    if "DBF" != engine.upper():
+        raise click.UsageError(f"Only DBF files can be packed, not '{source}'.")
+
+    deleted: int = modules.dbf_controller.pack_table(engine, source)
+
+    print(f"Removed {deleted} deleted rows.")
+
+
+@cli.command()
+@click.option(
+    "-s",
+    "--source",
+    help="Expects a DBF file.",
+    required=True,
+)
+@click.option(
+    "-f",
+    "--fields",
+    multiple=True,
+    help="Fields to index, or to drop the index of.",
+)
+@click.option(
+    "-d",
+    "--drop",
+    is_flag=True,
+    help="Drop the indexes of the fields, or all of them.",
+)
+@click.version_option(config.VERSION, "-v", "--version")
+@click.help_option("-h", "--help")
+@utils.embed_examples
+def index(source: str, fields: tuple, drop: bool) -> None:
+    """Index fields of a DBF file to look up their values without a scan."""
+
+    # Use cases
+    if not (engine := utils.check_engine(source)):
+        raise click.UsageError(f"Unknown extension for '{source}'.")
+
+    if "DBF" != engine.upper():
+        raise click.UsageError(f"Only DBF files can be indexed, not '{source}'.")
+
+    if drop:
+        dropped: int = modules.dbf_controller.drop_indexes(engine, source, fields)
+        print(f"Dropped {dropped} indexes.")
+
+    elif not fields:
+        raise click.UsageError("Missing option '-f' / '--fields'.")
+
+    else:
+        rows: int = modules.dbf_controller.index_fields(engine, source, fields)
+        print(f"Indexed {rows} rows on {", ".join(fields)}.")
+
+
 @cli.command()
 @click.option(
     "-r",
@@ -323,13 +531,13 @@ def drop(rdbms: str, source: str, table: str | None) -> None:
         raise click.UsageError(f"Unknown extension for '{source}'.")
 
     if "DBF" == engine.upper():
-        dbf_controller.drop_table(engine, source)
+        modules.dbf_controller.drop_table(engine, source)
 
     elif not table and "SQLite" == rdbms:
-        sql_controller.drop_database(engine, source)
+        modules.sql_controller.drop_database(engine, source)
 
     elif "SQLite" == rdbms:
-        sql_controller.drop_table(engine, source, table)
+        modules.sql_controller.drop_table(engine, source, table)
 
     else:
         raise NotImplementedError
@@ -353,15 +561,17 @@ def migrate(priority: str) -> None:
     and a list of extensions.
     """
 
+    from yaspin import yaspin
+
     with yaspin(color="cyan", timer=True) as spinner:
         try:
             spinner.text = "Initializing..."
-            setup: dict = sync_controller.init()
+            setup: dict = modules.sync_controller.init()
             relations: list = setup["relations"]
-            filenames: list = sync_controller.collect_files(setup, priority)
+            filenames: list = modules.sync_controller.collect_files(setup, priority)
 
             spinner.text = "Migrating..."
-            sync_controller.migrate(filenames, relations)
+            modules.sync_controller.migrate(filenames, relations)
 
             spinner.ok("DONE")
 
@@ -374,20 +584,58 @@ def migrate(priority: str) -> None:
 @click.help_option("-h", "--help")
 def sync():
     """Synchronize data between DBF and SQL files."""
+
+    import asyncio
+    from yaspin import yaspin
+
     priority: str = "DBF"
 
     with yaspin(color="cyan", timer=True) as spinner:
         try:
             spinner.text = "Initializing..."
-            setup: dict = sync_controller.init()
+            setup: dict = modules.sync_controller.init()
             relations: list = setup["relations"]
-            filenames: list = sync_controller.collect_files(setup, priority)
+            filenames: list = modules.sync_controller.collect_files(setup, priority)
 
             spinner.text = "Migrating..."
-            sync_controller.migrate(filenames, relations)
+            modules.sync_controller.migrate(filenames, relations)
+
+            def report(stats: dict) -> None:
+                spinner.text = (
+                    f"Listening... {stats['depth']} queued, "
+                    f"{stats['lag']:.2f}s lag"
+                )
 
             spinner.text = "Listening..."
-            asyncio.run(sync_controller.synchronize(setup, priority))
+            asyncio.run(modules.sync_controller.synchronize(setup, priority, report))
 
         except KeyboardInterrupt:
             spinner.ok("END")
+
+
+@cli.command()
+@click.version_option(config.VERSION, "-v", "--version")
+@click.help_option("-h", "--help")
+@utils.embed_examples
+def serve() -> None:
+    """
+    Serve the commands of other dbfxsql calls from this process.
+
+    While it runs, create, insert, read, update, delete, pack and index are
+    sent to it through a socket, so they skip the startup of the tool and
+    find the files and connections they use already open.
+    """
+
+    socketpath: str = os.path.expanduser(config.SOCKET_PATH)
+
+    # no spinner, as the output of served commands is captured from stdout
+    print(f"Serving on {socketpath}")
+
+    # being stopped by a service manager cleans up like an interrupt
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    try:
+        modules.serve_controller.serve(socketpath, cli)
+
+    except KeyboardInterrupt:
+        print("END")
@@ -1,4 +1,6 @@
 PATH: str = "~/.config/DBFxSQL/config.toml"
+STATE_PATH: str = "~/.config/DBFxSQL/state.sqlite"
+SOCKET_PATH: str = "~/.config/DBFxSQL/server.sock"
 
 TEMPLATE: str = """
 [folderpaths]
@@ -9,10 +11,44 @@ SQL = ["."]
 DBF = [".dbf", ".DBF"]
 SQL = [".sql", ".SQL"]
 
+[dbf]
+pack_threshold = 0.0
+
+[sqlite]
+journal_mode = "DELETE"
+synchronous = "FULL"
+cache_size = -2000
+mmap_size = 0
+cached_statements = 128
+
+[sync]
+quiet_period = 0.3
+workers = 0
+capture = false  # log the changes of SQL origins of keyed relations
+
 [[relations]]
 sources = ["users.dbf", "company.sql"]
 tables = ["", "users"]
 fields = [["id", "name"], ["id", "name"]]
+# keys = [["id"], ["id"]]  # match rows by key instead of by position
 """
 
+DBF: dict = {
+    "pack_threshold": 0.0,
+}
+
+SQLITE: dict = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": -2000,
+    "mmap_size": 0,
+    "cached_statements": 128,
+}
+
+SYNC: dict = {
+    "quiet_period": 0.3,
+    "workers": 0,
+    "capture": False,
+}
+
 VERSION = "0.1.0"
@@ -2,10 +2,15 @@ DBF: dict[str, str] = {
     "create": 'dbfxsql create -s users.dbf -f id "N(20,0)" -f name "C(20)"',
     "drop": "dbfxsql drop -s users.dbf",
     "insert": 'dbfxsql insert -s users.dbf -f id 1 -f name "John Doe"',
+    "import_csv": "dbfxsql import -s users.dbf -i users.csv",
     "read": "dbfxsql read -s users.dbf -c id == 1",
+    "read_export": "dbfxsql read -s users.dbf -F parquet -o users.parquet",
     "update": 'dbfxsql update -s users.dbf -f name "Jane Doe" -c id == 1',
     "delete": "dbfxsql delete -s users.dbf -c id == 1",
+    "pack": "dbfxsql pack -s users.dbf",
+    "index": "dbfxsql index -s users.dbf -f id",
     "migrate": "dbfxsql migrate -p SQL",
+    "serve": "dbfxsql serve",
 }
 
 
@@ -14,7 +19,9 @@ SQL: dict[str, str] = {
     "drop_database": "dbfxsql drop -s company.sql",
     "drop_table": "dbfxsql drop -s company.sql -t users",
     "insert": 'dbfxsql insert -s company.sql -t users -f id 1 -f name "John Doe"',
+    "import_dbf": "dbfxsql import -s company.sql -t users -i users.dbf -b 100000",
     "read": "dbfxsql read -s company.sql -t users -c id == 1",
+    "read_export": "dbfxsql read -s company.sql -t users -F csv -o users.csv",
     "update": 'dbfxsql update -s company.sql -t users -f name "Jane Doe" -c id == 1',
     "delete": "dbfxsql delete -s company.sql -t users -c id == 1",
     "migrate": "dbfxsql migrate -p SQL",
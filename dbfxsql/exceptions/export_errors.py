@@ -0,0 +1,18 @@
+from ..models.error_template import ErrorTemplate
+
+
+class FormatNotAvailable(ErrorTemplate):
+    """Error raised when an output format needs a package that isn't installed."""
+
+    def __init__(self, _format: str, package: str, extra: str):
+        super().__init__(
+            f"Format '{_format}' requires the '{package}' package, "
+            f"installed with the '{extra}' extra: pip install 'dbfxsql[{extra}]'."
+        )
+
+
+class OutputRequired(ErrorTemplate):
+    """Error raised when a binary format is going to be written to the terminal."""
+
+    def __init__(self, _format: str):
+        super().__init__(f"Format '{_format}' must be written to an output file.")
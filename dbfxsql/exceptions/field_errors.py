@@ -13,3 +13,10 @@ class FieldReserved(ErrorTemplate):
 
     def __init__(self, field: str):
         super().__init__(f"Field '{field}' is reserved and cannot be assigned.")
+
+
+class FieldNotIndexable(ErrorTemplate):
+    """Error raised when a field can't be indexed."""
+
+    def __init__(self, field: str):
+        super().__init__(f"Field '{field}' can't be indexed.")
@@ -9,3 +9,8 @@ class RowNotFound(ErrorTemplate):
 class RowAlreadyExists(ErrorTemplate):
     def __init__(self, row_id: int):
         super().__init__(f"Row already exists with id: {row_id}")
+
+
+class RowsNotImported(ErrorTemplate):
+    def __init__(self, reason: str):
+        super().__init__(f"No rows were imported: {reason}")
@@ -0,0 +1,6 @@
+from ..models.error_template import ErrorTemplate
+
+
+class ServerAlreadyRunning(ErrorTemplate):
+    def __init__(self, socketpath: str):
+        super().__init__(f"Server already running on '{socketpath}'.")
@@ -8,3 +8,10 @@ class ValueNotValid(ErrorTemplate):
         super().__init__(
             f"Value '{value}' not valid for field '{field}' with type '{_type}'"
         )
+
+
+class OperatorNotValid(ErrorTemplate):
+    """Error raised when a condition uses an unknown operator."""
+
+    def __init__(self, operator: str):
+        super().__init__(f"Operator '{operator}' not valid.")
@@ -0,0 +1,159 @@
+import csv
+import datetime
+import decimal
+import json
+import sys
+from collections.abc import Callable, Generator, Iterable
+from contextlib import contextmanager
+
+from ..exceptions.export_errors import FormatNotAvailable, OutputRequired
+
+
+FORMATS: tuple[str, ...] = ("table", "csv", "jsonl", "arrow", "parquet")
+CHUNK_SIZE: int = 65_536
+
+# formats of the output files a read can be exported to without '-F'
+EXTENSIONS: dict[str, str] = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".arrow": "arrow",
+    ".parquet": "parquet",
+}
+
+
+def export(
+    chunks: Iterable[dict[str, list]],
+    types: dict[str, type],
+    _format: str,
+    output: str | None = None,
+) -> int:
+    """Writes chunks of columns in the given format, returning the row count."""
+
+    writer: Callable = {
+        "csv": _write_csv,
+        "jsonl": _write_jsonl,
+        "arrow": _write_arrow,
+        "parquet": _write_parquet,
+    }[_format]
+
+    return writer(chunks, types, output)
+
+
+def _write_csv(chunks: Iterable[dict], types: dict, output: str | None) -> int:
+    count: int = 0
+
+    with _open_text(output) as file:
+        writer = csv.writer(file)
+        writer.writerow(types.keys())
+
+        for chunk in chunks:
+            rows: list[tuple] = list(zip(*chunk.values()))
+            writer.writerows(rows)
+            count += len(rows)
+
+    return count
+
+
+def _write_jsonl(chunks: Iterable[dict], types: dict, output: str | None) -> int:
+    count: int = 0
+
+    with _open_text(output) as file:
+        for chunk in chunks:
+            fields: list[str] = list(chunk.keys())
+
+            for row in zip(*chunk.values()):
+                file.write(json.dumps(dict(zip(fields, row)), default=_to_json))
+                file.write("\n")
+                count += 1
+
+    return count
+
+
+def _write_arrow(chunks: Iterable[dict], types: dict, output: str | None) -> int:
+    pa = _import_pyarrow("arrow")
+    from pyarrow import ipc
+
+    schema = _arrow_schema(pa, types)
+
+    with ipc.new_file(_require_output("arrow", output), schema) as writer:
+        return _write_batches(pa, writer, schema, chunks)
+
+
+def _write_parquet(chunks: Iterable[dict], types: dict, output: str | None) -> int:
+    pa = _import_pyarrow("parquet")
+    from pyarrow import parquet
+
+    schema = _arrow_schema(pa, types)
+
+    with parquet.ParquetWriter(_require_output("parquet", output), schema) as writer:
+        return _write_batches(pa, writer, schema, chunks)
+
+
+def _write_batches(pa: any, writer: any, schema: any, chunks: Iterable[dict]) -> int:
+    count: int = 0
+
+    for chunk in chunks:
+        batch = pa.RecordBatch.from_pydict(chunk, schema=schema)
+        writer.write_batch(batch)
+        count += batch.num_rows
+
+    return count
+
+
+def _arrow_schema(pa: any, types: dict[str, type]) -> any:
+    """Builds the Arrow schema of a table from the Python types of its fields."""
+
+    arrow_types: dict[type | None, any] = {
+        str: pa.string(),
+        int: pa.int64(),
+        float: pa.float64(),
+        decimal.Decimal: pa.float64(),
+        bool: pa.bool_(),
+        bytes: pa.binary(),
+        datetime.date: pa.date32(),
+        datetime.datetime: pa.timestamp("us"),
+    }
+
+    return pa.schema(
+        [(field, arrow_types.get(_type, pa.string())) for field, _type in types.items()]
+    )
+
+
+def _import_pyarrow(_format: str) -> any:
+    try:
+        import pyarrow
+
+    except ImportError:
+        raise FormatNotAvailable(_format, "pyarrow", "arrow")
+
+    return pyarrow
+
+
+def _require_output(_format: str, output: str | None) -> str:
+    if not output:
+        raise OutputRequired(_format)
+
+    return output
+
+
+@contextmanager
+def _open_text(output: str | None) -> Generator:
+    if not output:
+        yield sys.stdout
+        return
+
+    with open(output, "w", newline="") as file:
+        yield file
+
+
+def _to_json(value: any) -> any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+
+    if isinstance(value, bytes):
+        return value.hex()
+
+    return str(value)
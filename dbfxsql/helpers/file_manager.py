@@ -1,20 +1,44 @@
+import os
+import threading
 import tomllib
 
 from ..constants import config
+from ..models.config_snapshot import ConfigSnapshot
 
 from pathlib import Path
 
 
+_snapshot: ConfigSnapshot | None = None
+_stats: dict[str, int] = {"hits": 0, "reloads": 0}
+_lock: threading.Lock = threading.Lock()
+
+
 def load_config() -> dict:
-    configpath: Path = Path(config.PATH).expanduser()
+    return _load_snapshot().data
+
+
+def find_engine(extension: str) -> str:
+    """Returns the engine that handles an extension, or an empty string."""
+
+    return _load_snapshot().engines.get(extension, "")
+
+
+def find_folder(engine: str) -> str:
+    """Returns the main folderpath of an engine, ending with a slash."""
 
-    if not configpath.exists():
-        _create_default_config(configpath)
+    return _load_snapshot().folders[engine]
 
-    with open(configpath.as_posix(), "rb") as configfile:
-        toml_data: dict = tomllib.load(configfile)
 
-    return toml_data
+def find_relations(filename: str) -> list[dict]:
+    """Returns the relations where a filename is one of the sources."""
+
+    return _load_snapshot().relations.get(filename, [])
+
+
+def config_stats() -> dict[str, int]:
+    """Returns how many times the config was served from memory or reloaded."""
+
+    return dict(_stats)
 
 
 def new_file(sourcepath: str) -> None:
@@ -34,6 +58,52 @@ def get_filenames(paths: list[str], extensions: tuple[str]) -> list[str]:
     ]
 
 
+def _load_snapshot() -> ConfigSnapshot:
+    """Parses the config file again only when its mtime or size changed."""
+
+    global _snapshot
+
+    configpath: Path = Path(config.PATH).expanduser()
+
+    with _lock:
+        if not configpath.exists():
+            _create_default_config(configpath)
+
+        stat: os.stat_result = configpath.stat()
+        stamp: tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+
+        if _snapshot and stamp == _snapshot.stamp:
+            _stats["hits"] += 1
+            return _snapshot
+
+        with open(configpath.as_posix(), "rb") as configfile:
+            toml_data: dict = tomllib.load(configfile)
+
+        _snapshot = _index_config(stamp, toml_data)
+        _stats["reloads"] += 1
+
+    return _snapshot
+
+
+def _index_config(stamp: tuple[int, int], toml_data: dict) -> ConfigSnapshot:
+    engines: dict[str, str] = {}
+    folders: dict[str, str] = {}
+    relations: dict[str, list[dict]] = {}
+
+    for engine, extensions in toml_data.get("extensions", {}).items():
+        for extension in extensions:
+            engines.setdefault(extension, engine)
+
+    for engine, folderpaths in toml_data.get("folderpaths", {}).items():
+        folders[engine] = folderpaths[0].rstrip("/") + "/"
+
+    for relation in toml_data.get("relations", []):
+        for source in relation["sources"]:
+            relations.setdefault(source, []).append(relation)
+
+    return ConfigSnapshot(stamp, toml_data, engines, folders, relations)
+
+
 def _create_default_config(configpath: Path) -> None:
     configpath.parent.mkdir(parents=True, exist_ok=True)
     configpath.touch()
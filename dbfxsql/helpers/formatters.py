@@ -1,7 +1,11 @@
 import decimal
-from collections.abc import Iterable
+import hashlib
+from collections import defaultdict, deque
+from collections.abc import Callable, Generator, Iterable
+from itertools import repeat
+from operator import itemgetter
 
-from . import file_manager, validators, utils
+from . import file_manager, predicates, utils
 from ..constants.data_types import DATA_TYPES
 from ..models.sync_table import SyncTable
 from ..exceptions.field_errors import FieldNotFound
@@ -18,12 +22,8 @@ def decompose_filename(file: str) -> tuple[str, str]:
 
 def add_folderpath(engine: str, source: str) -> str:
     """Adds the folderpath to the source depending on the engine."""
-    folderpath: str = file_manager.load_config()["folderpaths"][engine][0]
 
-    if not folderpath.endswith("/"):
-        folderpath += "/"
-
-    return folderpath + source
+    return file_manager.find_folder(engine) + source
 
 
 def fields_to_str(fields: Iterable[tuple[str, str]], sep: str = ", ") -> str:
@@ -85,45 +85,127 @@ def scourgify_rows(rows: list[dict]) -> list[dict]:
     return [dict(zip(lower_fields, row.values())) for row in rows]
 
 
-def quote_values(types: dict[str, str], condition: tuple) -> tuple:
-    field, operator, value = condition
+def filter_rows(
+    rows: list, condition: tuple, types: dict[str, str]
+) -> tuple[list, list]:
+    matches: list[tuple] = list(filter_stream(rows, condition, types))
 
-    if field == "row_number":
-        return field, operator, value
+    return [row for _, row in matches], [index for index, _ in matches]
 
-    if field not in types:
-        raise FieldNotFound(field)
 
-    _type: str = types[field]
+def parse_position(condition: tuple) -> int | None:
+    """Returns the row index targeted by a row_number equality, if any."""
 
-    # SQL
-    if "TEXT" == _type:
-        value = f"'{value}'"
+    field, operator, value = _parse_condition(condition)
 
-    return field, operator, value
+    if "==" == operator and "row_number" == field:
+        return value
 
 
-def filter_rows(rows: list, condition: tuple) -> tuple[list, list]:
-    filter: str = ""
-    _rows: list = []
-    indexes: list = []
+def filter_stream(
+    rows: Iterable[dict], condition: tuple, types: dict[str, str]
+) -> Generator[tuple[int, dict]]:
+    """
+    Yields the index and row of each match, stopping at the first one when
+    the condition targets a single row_number.
+    """
 
     field, operator, value = _parse_condition(condition)
 
     if "==" == operator and "row_number" == field:
-        return [rows[value]], [value]
+        for index, row in enumerate(rows):
+            if index == value:
+                yield index, row
+                return
 
-    for index, row in enumerate(rows):
-        if isinstance(row[field], str):
-            filter = f"'{row[field]}'{operator}'{value}'"
-        else:
-            filter = f"{row[field]}{operator}{value}"
+        return
+
+    if "row_number" == field:
+        position: Callable = predicates.compile_position(condition)
+        yield from ((index, row) for index, row in enumerate(rows) if position(index))
+
+    else:
+        predicate: Callable = predicates.compile_condition("DBF", types, condition)
+        yield from ((index, row) for index, row in enumerate(rows) if predicate(row))
+
+
+def chunk_columns(rows: Iterable[dict], size: int) -> Generator[dict[str, list]]:
+    """Regroups a stream of rows into chunks of columns."""
+
+    columns: dict[str, list] = {}
+
+    for row in rows:
+        for field, value in row.items():
+            columns.setdefault(field, []).append(value)
+
+        if size == len(next(iter(columns.values()))):
+            yield columns
+            columns = {}
+
+    if columns:
+        yield columns
+
+
+def batch_rows(rows: Iterable, size: int) -> Generator[list]:
+    """Regroups a stream of rows into lists of a given size."""
+
+    batch: list = []
+
+    for row in rows:
+        batch.append(row)
+
+        if size == len(batch):
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def compile_row_coercion(
+    engine: str, types: dict[str, str], fields: Iterable[str]
+) -> tuple[list[str], Callable[[list[dict]], list[tuple]]]:
+    """
+    Matches the given fields with the ones of a table, ignoring their case,
+    and resolves the conversion of each column once for a whole stream.
+    Returns the table field names and a function from batches of rows to
+    batches of typed tuples, converted column by column.
+    """
+
+    names: dict[str, str] = {field.lower(): field for field in types}
+    table_fields: list[str] = []
+
+    for field in fields:
+        if field.lower() not in names:
+            raise FieldNotFound(field)
+
+        table_fields.append(names[field.lower()])
+
+    coercions: list[tuple[str, Callable]] = [
+        (field, predicates.compile_coercion(engine, name, types[name]))
+        for field, name in zip(fields, table_fields)
+    ]
+
+    def coerce(rows: list[dict]) -> list[tuple]:
+        columns: list[Iterable] = [
+            map(convert, map(dict.get, rows, repeat(field)))
+            for field, convert in coercions
+        ]
+
+        return list(zip(*columns))
 
-        if eval(filter):
-            _rows.append(row)
-            indexes.append(index)
+    return table_fields, coerce
 
-    return _rows, indexes
+
+def python_types(engine: str, types: dict[str, str]) -> dict[str, type]:
+    """Maps the field types of a table to the Python types of their values."""
+
+    data_type: dict = DATA_TYPES[engine]
+
+    return {
+        field: data_type.get(_type.upper()) or str
+        for field, _type in types.items()
+    }
 
 
 def scourgify_types(types: list[dict[str, str]]) -> dict[str, str]:
@@ -171,6 +253,7 @@ def package_changes(filenames: list[str], relations: list[dict]) -> list[dict]:
                 source=origin_data.source,
                 name=origin_data.name,
                 fields=origin_fields,
+                keys=origin_tables[name]["keys"],
             )
 
             changes.append({"origin": origin, "destinies": destinies})
@@ -191,11 +274,13 @@ def _parse_origin(filename: str, relations: list[dict]) -> dict:
 
             if origin.name in origin_tables.keys():
                 origin_tables[origin.name]["fields"].append(origin.fields)
+                origin_tables[origin.name]["keys"].append(origin.keys)
                 origin_tables[origin.name]["destinies"].append(destiny)
             else:
                 origin_tables[origin.name] = {
                     "data": origin,
                     "fields": [origin.fields],
+                    "keys": [origin.keys],
                     "destinies": [destiny],
                 }
 
@@ -264,47 +349,295 @@ def classify_operations(residual_tables: tuple) -> list:
     return operations
 
 
+def classify_by_keys(
+    origin: SyncTable, origin_fields: list, origin_keys: list, destiny: SyncTable
+) -> dict:
+    """
+    Matches the rows of both tables by their key fields instead of their
+    position: origin keys missing in the destiny are inserted, the ones whose
+    mapped fields differ are updated and the destiny keys left are deleted.
+    The first row of a repeated key is the one synced.
+    """
+
+    mapped: tuple = mapped_fields((origin_fields, destiny.fields))
+
+    origin_key: Callable = _tuple_key(origin_keys)
+    origin_values: Callable = _tuple_key(mapped[0])
+
+    destiny_key: Callable = _tuple_key(destiny.keys)
+    destiny_values: Callable = _tuple_key(mapped[1])
+
+    destiny_rows: dict[tuple, tuple] = {}
+
+    for row in destiny.rows:
+        destiny_rows.setdefault(destiny_key(row), destiny_values(row))
+
+    operation: dict = {"insert": [], "update": [], "delete": [], "keys": destiny.keys}
+    synced: set[tuple] = set()
+
+    for row in origin.rows:
+        if (key := origin_key(row)) in synced:
+            continue
+
+        synced.add(key)
+
+        if destiny_rows.get(key) == origin_values(row):
+            continue
+
+        fields: dict = _depurate_fields(row, origin_fields)
+        fields = _change_fields(fields, destiny.fields)
+
+        if key in destiny_rows:
+            key_fields: dict = dict(zip(destiny.keys, key))
+            operation["update"].append({"key": key_fields, "fields": fields})
+        else:
+            operation["insert"].append({"fields": fields})
+
+    operation["delete"] = [
+        {"key": dict(zip(destiny.keys, key))}
+        for key in destiny_rows
+        if key not in synced
+    ]
+
+    return operation
+
+
+def classify_changes(
+    changes: tuple, origin_fields: list, origin_keys: list, destiny: SyncTable
+) -> dict:
+    """
+    Turns the rows logged as changed in the origin into an upsert of each one
+    by key, deleting the former keys that no changed row holds anymore.
+    """
+
+    _, rows, removed = changes
+    origin_key: Callable = _tuple_key(origin_keys)
+
+    operation: dict = {
+        "insert": [],
+        "update": [],
+        "delete": [],
+        "keys": destiny.keys,
+        "upsert": True,
+    }
+    synced: set[tuple] = set()
+
+    for row in rows:
+        if (key := origin_key(row)) in synced:
+            continue
+
+        synced.add(key)
+
+        fields: dict = _depurate_fields(row, origin_fields)
+        fields = _change_fields(fields, destiny.fields)
+
+        operation["update"].append(
+            {"key": dict(zip(destiny.keys, key)), "fields": fields}
+        )
+
+    operation["delete"] = [
+        {"key": dict(zip(destiny.keys, key))}
+        for key in dict.fromkeys(map(origin_key, removed))
+        if key not in synced
+    ]
+
+    return operation
+
+
+def unpack_operation(engine: str, types: dict[str, str], operation: dict) -> tuple:
+    """Splits an operation into typed inserts, updates and deletes."""
+
+    inserts: list[dict] = [
+        assign_types(engine, types, {**row["fields"]}) for row in operation["insert"]
+    ]
+
+    updates: list[tuple[int | dict, dict]] = [
+        (
+            _locate_row(engine, types, row),
+            assign_types(engine, types, {**row["fields"]}),
+        )
+        for row in operation["update"]
+    ]
+
+    deletes: list[int | dict] = [
+        _locate_row(engine, types, row) for row in operation["delete"]
+    ]
+
+    return inserts, updates, deletes
+
+
+def _locate_row(engine: str, types: dict[str, str], row: dict) -> int | dict:
+    """Position of a row to change, or its typed key in keyed operations."""
+
+    if "key" in row:
+        return assign_types(engine, types, {**row["key"]})
+
+    return row["index"]
+
+
+def fingerprint_rows(rows: list[dict], fields: list[str]) -> list[int]:
+    """
+    Hashes the mapped fields of each row into a 64-bit fingerprint that stays
+    the same between runs, and between values that compare as equal.
+    """
+
+    row_key: Callable = _row_key(fields)
+    fingerprints: list[int] = []
+
+    for row in rows:
+        values: tuple = row_key(row) if 1 != len(fields) else (row_key(row),)
+        data: bytes = "\x1f".join(map(_stable_value, values)).encode(errors="replace")
+
+        digest: bytes = hashlib.blake2b(data, digest_size=8).digest()
+        fingerprints.append(int.from_bytes(digest, "little"))
+
+    return fingerprints
+
+
+def compare_fingerprints(
+    origin: SyncTable, origin_fields: list[str], destiny: SyncTable, hashes: list
+) -> tuple:
+    """
+    Compares the origin rows against a destiny known only by the fingerprints
+    of its rows, with the same residuals as compare_tables.
+    """
+
+    mapped: tuple = mapped_fields((origin_fields, destiny.fields))
+
+    residual_indexes: tuple = _pair_keys(
+        fingerprint_rows(origin.rows, mapped[0]), hashes
+    )
+
+    residual_origin: list = [
+        {"index": index, "fields": origin.rows[index]} for index in residual_indexes[0]
+    ]
+    residual_destiny: list = [
+        {"index": index, "fields": None} for index in residual_indexes[1]
+    ]
+
+    for residual in residual_origin:
+        residual["fields"] = _depurate_fields(residual["fields"], origin_fields)
+        residual["fields"] = _change_fields(residual["fields"], destiny.fields)
+
+    return residual_origin, residual_destiny
+
+
+def mapped_fields(fields: tuple) -> tuple:
+    """Cuts both field lists of a relation to the fields they map in pairs."""
+
+    width: int = min(len(field_names) for field_names in fields)
+
+    return tuple(field_names[:width] for field_names in fields)
+
+
 def _compare_rows(origin_rows: list, destiny_rows: list, fields: tuple) -> tuple:
-    residual_origin: list = []
+    """
+    Pairs equal rows of both tables through hashed buckets of their mapped
+    fields, returning the rows left without a pair on each side.
+    """
+
+    origin_fields, destiny_fields = mapped_fields(fields)
+
+    origin_keys: Iterable = map(_row_key(origin_fields), origin_rows)
+    destiny_keys: Iterable = map(_row_key(destiny_fields), destiny_rows)
+
+    residual_indexes: tuple = _pair_keys(origin_keys, destiny_keys)
+
+    residual_origin: list = [
+        {"index": index, "fields": origin_rows[index]} for index in residual_indexes[0]
+    ]
     residual_destiny: list = [
-        {"index": index, "fields": fields} for index, fields in enumerate(destiny_rows)
+        {"index": index, "fields": destiny_rows[index]}
+        for index in residual_indexes[1]
     ]
 
-    origin_range: int = len(origin_rows)
-    destiny_range: int = len(destiny_rows)
+    return residual_origin, residual_destiny
+
 
-    origin_index: int = 0
+def _pair_keys(origin_keys: Iterable, destiny_keys: Iterable) -> tuple:
+    """
+    Pairs each origin key with the first unpaired destiny key equal to it,
+    returning the indexes left without a pair on each side.
+    """
 
-    while origin_index < origin_range:
-        destiny_index: int = 0
-        origin_row: dict = origin_rows[origin_index]
+    # first destiny index of each key, later ones queue up in order
+    buckets: dict[tuple, int] = {}
+    duplicates: dict[tuple, deque] = defaultdict(deque)
 
-        if not destiny_range:
-            residual_origin.append({"index": origin_index, "fields": origin_row})
+    destiny_range: int = 0
 
-        while destiny_index < destiny_range:
-            destiny_row: dict = residual_destiny[destiny_index]["fields"]
+    for index, key in enumerate(destiny_keys):
+        destiny_range += 1
 
-            if validators.same_rows(origin_row, destiny_row, fields):
-                # New list skipping then existent index
+        if key in buckets:
+            duplicates[key].append(index)
+        else:
+            buckets[key] = index
+
+    residual_origin: list[int] = []
+    paired: set[int] = set()
 
-                residual_destiny = (
-                    residual_destiny[:destiny_index]
-                    + residual_destiny[destiny_index + 1 :]
-                )
+    for index, key in enumerate(origin_keys):
+        if (destiny_index := buckets.pop(key, None)) is None:
+            residual_origin.append(index)
+            continue
 
-                destiny_range -= 1
-                break
+        paired.add(destiny_index)
 
-            if destiny_index == destiny_range - 1:
-                residual_origin.append({"index": origin_index, "fields": origin_row})
+        if duplicates.get(key):
+            buckets[key] = duplicates[key].popleft()
 
-            destiny_index += 1
-        origin_index += 1
+    residual_destiny: list[int] = [
+        index for index in range(destiny_range) if index not in paired
+    ]
 
     return residual_origin, residual_destiny
 
 
+def _row_key(fields: list[str]) -> Callable:
+    """Builds the function that extracts the hashable key of a row."""
+
+    if not fields:
+        return lambda row: ()
+
+    return itemgetter(*fields)
+
+
+def _tuple_key(fields: list[str]) -> Callable[[dict], tuple]:
+    """Like _row_key, but always returning a tuple."""
+
+    if 1 == len(fields):
+        field: str = fields[0]
+        return lambda row: (row[field],)
+
+    return _row_key(fields)
+
+
+def _stable_value(value: any) -> str:
+    """Text of a value that doesn't depend on the hash seed of the process."""
+
+    if isinstance(value, str):
+        return "s" + value
+
+    if isinstance(value, int):
+        return f"n{int(value)}"
+
+    # equal int, float and Decimal values share the same text
+    if isinstance(value, (float, decimal.Decimal)):
+        try:
+            integral: int = int(value)
+        except (ArithmeticError, ValueError):
+            return f"{type(value).__name__}{value!r}"
+
+        # numeric hashes don't depend on the seed
+        return f"n{integral}" if integral == value else f"n{hash(value)}"
+
+    if value is None:
+        return "z"
+
+    return f"{type(value).__name__}{value!r}"
+
+
 def _search_filenames(filename: str, relations: list[dict]) -> str | None:
     for relation in relations:
         if filename in relation["sources"]:
@@ -351,6 +684,7 @@ def _parse_tables(relation: dict) -> list[SyncTable, SyncTable]:
             source=relation["sources"][index],
             name=relation["tables"][index],
             fields=relation["fields"][index],
+            keys=relation.get("keys", [[]] * len(relation["sources"]))[index],
         )
 
         tables.append(table)
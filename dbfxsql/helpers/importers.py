@@ -0,0 +1,52 @@
+import csv
+import json
+from collections.abc import Generator
+
+from . import formatters, validators
+from ..exceptions.source_errors import SourceNotFound
+
+
+FORMATS: tuple[str, ...] = ("csv", "jsonl", "dbf")
+BATCH_SIZE: int = 50_000
+
+EXTENSIONS: dict[str, str] = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".dbf": "dbf",
+}
+
+
+def detect_format(filepath: str) -> str:
+    """Returns the input format matching the extension of a file, or ''."""
+
+    _, extension = formatters.decompose_filename(filepath)
+
+    return EXTENSIONS.get(extension.lower(), "")
+
+
+def read_rows(filepath: str, _format: str) -> Generator[dict]:
+    """Lazily yields the rows of a CSV or JSON Lines file."""
+
+    if not validators.path_exists(filepath):
+        raise SourceNotFound(filepath)
+
+    reader: Generator = {"csv": _read_csv, "jsonl": _read_jsonl}[_format]
+
+    yield from reader(filepath)
+
+
+def _read_csv(filepath: str) -> Generator[dict]:
+    with open(filepath, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+
+        if header := next(reader, None):
+            for row in reader:
+                yield dict(zip(header, row))
+
+
+def _read_jsonl(filepath: str) -> Generator[dict]:
+    with open(filepath, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,131 @@
+import datetime
+import decimal
+import operator
+from collections.abc import Callable
+
+from ..constants.data_types import DATA_TYPES
+from ..exceptions.field_errors import FieldNotFound
+from ..exceptions.value_errors import OperatorNotValid, ValueNotValid
+
+
+OPERATORS: dict[str, Callable] = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<>": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+PARSERS: dict[type, Callable] = {
+    bytes: str.encode,
+    bool: lambda value: {"True": True, "False": False}[value],
+    datetime.date: lambda value: datetime.date.fromisoformat(value.replace("/", "-")),
+    datetime.datetime: lambda value: datetime.datetime.fromisoformat(value),
+}
+
+
+def compile_condition(
+    engine: str, types: dict[str, str], condition: tuple
+) -> Callable[[dict], bool]:
+    """
+    Parses a (field, operator, value) condition once into a closure that
+    compares the field of a row against the value coerced to the field type.
+    """
+
+    field, _operator, value = condition
+    field = field.lower()
+
+    if field not in types:
+        raise FieldNotFound(field)
+
+    compare: Callable = parse_operator(_operator)
+    literal: any = coerce_value(engine, field, types[field], value)
+
+    def predicate(row: dict) -> bool:
+        try:
+            return compare(row[field], literal)
+
+        except TypeError:  # empty values can't be ordered
+            return False
+
+    return predicate
+
+
+def compile_position(condition: tuple) -> Callable[[int], bool]:
+    """Compiles a condition over row_number into a closure over row indexes."""
+
+    _, _operator, value = condition
+
+    compare: Callable = parse_operator(_operator)
+    literal: int = coerce_value("SQL", "row_number", "INTEGER", value)
+
+    return lambda index: compare(index + 1, literal)
+
+
+def parse_operator(_operator: str) -> Callable:
+    if _operator not in OPERATORS:
+        raise OperatorNotValid(_operator)
+
+    return OPERATORS[_operator]
+
+
+def coerce_value(engine: str, field: str, _type: str, value: str) -> any:
+    """Converts a literal to the Python type of a field."""
+
+    data_type: type | None = DATA_TYPES[engine].get(_type)
+
+    if data_type is None:
+        return value
+
+    # the readers decode numeric fields as int or float, which never equal a Decimal
+    parse: Callable = (
+        parse_number
+        if decimal.Decimal is data_type
+        else PARSERS.get(data_type, data_type)
+    )
+
+    try:
+        return parse(value)
+
+    except (KeyError, ValueError, decimal.InvalidOperation):
+        raise ValueNotValid(value, field, _type)
+
+
+def compile_coercion(engine: str, field: str, _type: str) -> Callable[[any], any]:
+    """
+    Resolves once how the values of a field are converted to its Python type,
+    leaving the ones that already have it untouched.
+    """
+
+    data_type: type | None = DATA_TYPES[engine].get(_type)
+
+    if data_type is None:
+        return lambda value: value
+
+    parse: Callable = PARSERS.get(data_type, data_type)
+
+    def coerce(value: any) -> any:
+        if value is None or isinstance(value, data_type):
+            return value
+
+        if "" == value:  # empty cells of typed columns
+            return None
+
+        try:
+            return parse(str(value))
+
+        except (KeyError, TypeError, ValueError, decimal.InvalidOperation):
+            raise ValueNotValid(value, field, _type)
+
+    return coerce
+
+
+def parse_number(value: str) -> int | float:
+    try:
+        return int(value)
+
+    except ValueError:
+        return float(value)
@@ -3,13 +3,12 @@ import types
 from dbfxsql.constants import sample_commands
 from dbfxsql.helpers import file_manager, formatters
 
-from prettytable import PrettyTable
-from watchfiles import Change
-
 
 def show_table(rows: list[dict]) -> None:
     """Displays a list of rows in a table format."""
 
+    from prettytable import PrettyTable
+
     table = PrettyTable()
 
     table.field_names = rows[0].keys() if rows else []
@@ -29,21 +28,23 @@ def embed_examples(func: types.FunctionType) -> types.FunctionType:
     ---------
     """
 
-    for command in sample_commands.DBF.keys():
-        if func.__name__ in command:
-            examples += "- " + sample_commands.DBF[command]
+    samples: list[str] = [
+        sample
+        for commands in (sample_commands.DBF, sample_commands.SQL)
+        for command, sample in commands.items()
+        if func.__name__ in command
+    ]
 
-    for command in sample_commands.SQL.keys():
-        if func.__name__ in command:
-            examples += "\n    "
-            examples += "- " + sample_commands.SQL[command]
+    examples += "\n    ".join(f"- {sample}" for sample in samples)
 
     func.__doc__ += examples
 
     return func
 
 
-def only_modified(change: Change, path: str) -> bool:
+def only_modified(change: int, path: str) -> bool:
+    from watchfiles import Change
+
     allowed_extensions: tuple[str] = (".dbf", ".sql")
 
     return change == Change.modified and path.endswith(allowed_extensions)
@@ -66,15 +67,6 @@ def notify(operations: list, tables: list) -> None:
 
 
 def check_engine(source: str) -> str:
-    engine: str = ""
     extension: str = formatters.decompose_filename(source)[1]
 
-    extensions: dict = file_manager.load_config()["extensions"]
-
-    if extension in extensions["DBF"]:
-        engine = "DBF"
-
-    elif extension in extensions["SQL"]:
-        engine = "SQL"
-
-    return engine
+    return file_manager.find_engine(extension)
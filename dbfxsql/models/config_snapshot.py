@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """Parsed config file with the lookup tables derived from it."""
+
+    stamp: tuple[int, int]
+    data: dict
+    engines: dict[str, str] = field(default_factory=dict)
+    folders: dict[str, str] = field(default_factory=dict)
+    relations: dict[str, list[dict]] = field(default_factory=dict)
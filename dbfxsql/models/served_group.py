@@ -0,0 +1,26 @@
+import os
+import sys
+
+from .lazy_group import LazyGroup
+from ..constants import config
+
+
+class ServedGroup(LazyGroup):
+    """
+    A lazy group that hands its command line to a running `dbfxsql serve`,
+    before importing its subcommands, and runs it itself when none is running.
+    """
+
+    def main(self, args: list[str] | None = None, **kwargs: any) -> any:
+        args = sys.argv[1:] if args is None else list(args)
+        socketpath: str = os.path.expanduser(config.SOCKET_PATH)
+
+        if os.path.exists(socketpath):
+            from ..modules.serve import serve_controller
+
+            if (reply := serve_controller.forward(socketpath, args)) is not None:
+                sys.stdout.write(reply["stdout"])
+                sys.stderr.write(reply["stderr"])
+                sys.exit(reply["status"])
+
+        return super().main(args, **kwargs)
@@ -0,0 +1,11 @@
+from array import array
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class SyncState:
+    """Last synced version of a destiny table, as seen from its origin."""
+
+    origin_stamp: str
+    destiny_stamp: str
+    fingerprints: array
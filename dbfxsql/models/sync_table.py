@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass(frozen=True, slots=True)
@@ -8,3 +8,4 @@ class SyncTable:
     name: str
     fields: list[str]
     rows: list | None = None
+    keys: list = field(default_factory=list)
@@ -1,3 +1,21 @@
-from .dbf import dbf_controller
-from .sql import sql_controller
-from .sync import sync_controller
+"""Controllers of each engine, imported the first time they're used"""
+
+from importlib import import_module
+
+
+CONTROLLERS: dict[str, str] = {
+    "dbf_controller": ".dbf.dbf_controller",
+    "sql_controller": ".sql.sql_controller",
+    "sync_controller": ".sync.sync_controller",
+    "serve_controller": ".serve.serve_controller",
+}
+
+
+def __getattr__(name: str) -> any:
+    if name not in CONTROLLERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module: any = import_module(CONTROLLERS[name], __name__)
+    globals()[name] = module
+
+    return module
@@ -1,23 +1,49 @@
+import os
 from contextlib import contextmanager
 from collections.abc import Generator
 
 import dbf
-from pathlib import Path
+
+from . import dbf_records
+
+
+# closed tables kept between opens, with the stamp of the file they last saw
+_tables: dict[str, tuple[tuple, dbf.Table]] = {}
 
 
 @contextmanager
 def get_table(sourcepath: str) -> Generator[dbf.Table]:
     """Context manager to open and manage a DBF table."""
 
+    path: str = os.path.abspath(sourcepath)
+
     # create the table if it doesn't exist
-    if not Path(sourcepath).read_bytes():
-        table: dbf.Table = dbf.Table(sourcepath, "tmp N(1,0)").open(dbf.READ_WRITE)
+    if not os.path.getsize(path):
+        table: dbf.Table = dbf.Table(path, "tmp N(1,0)").open(dbf.READ_WRITE)
         table.delete_fields(table.field_names)
+        table.close()
 
-    table: dbf.Table = dbf.Table(sourcepath).open(dbf.READ_WRITE)
+    table: dbf.Table = _checkout(path)
+    table.open(dbf.READ_WRITE)
 
     try:
         yield table
 
     finally:
         table.close()
+        _tables[path] = (dbf_records.stamp(path), table)
+
+
+def _checkout(path: str) -> dbf.Table:
+    """
+    Takes the cached table of a path while its file is unchanged, so nested or
+    concurrent opens of the same path each get a table of their own.
+    """
+
+    stamp, table = _tables.pop(path, (None, None))
+
+    if table is not None and stamp == dbf_records.stamp(path):
+        return table
+
+    return dbf.Table(path)
+
@@ -1,9 +1,15 @@
-from collections.abc import Iterable
+import itertools
+from collections.abc import Generator, Iterable
 
-from . import dbf_queries
-from dbfxsql.helpers import file_manager, formatters, validators
+from . import dbf_index, dbf_queries
+from dbfxsql.constants import config
+from dbfxsql.helpers import file_manager, formatters, predicates, validators
 from dbfxsql.exceptions.source_errors import SourceAlreadyExists, SourceNotFound
-from dbfxsql.exceptions.field_errors import FieldReserved
+from dbfxsql.exceptions.field_errors import (
+    FieldNotFound,
+    FieldNotIndexable,
+    FieldReserved,
+)
 from dbfxsql.exceptions.row_errors import RowNotFound
 
 
@@ -37,21 +43,58 @@ def insert_row(engine: str, source: str, fields: Iterable[tuple]) -> None:
 
 
 def read_rows(engine: str, source: str, condition: tuple | None) -> list[dict]:
+    rows: list[dict] = list(stream_rows(engine, source, condition))
+
+    if rows:
+        return rows
+
+    if condition:
+        raise RowNotFound(condition)
+
+    # an empty table still shows its fields
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    return [dict.fromkeys(dbf_queries.fetch_types(sourcepath), "")]
+
+
+def stream_rows(
+    engine: str, source: str, condition: tuple | None
+) -> Generator[dict]:
+    """Yields the rows matching a condition while the table is being scanned."""
+
     sourcepath: str = formatters.add_folderpath(engine, source)
 
     if not validators.path_exists(sourcepath):
         raise SourceNotFound(sourcepath)
 
-    rows: list[dict] = dbf_queries.read(sourcepath)
-    rows = formatters.scourgify_rows(rows)
+    if not condition:
+        yield from dbf_queries.stream(sourcepath)
+        return
 
-    if condition:
-        rows, _ = formatters.filter_rows(rows, condition)
+    for _, row in _match_rows(sourcepath, condition, indexed=False):
+        yield row
 
-    if not rows:
-        raise RowNotFound(condition)
 
-    return rows
+def read_columns(
+    engine: str, source: str, condition: tuple | None, size: int
+) -> tuple[dict[str, type], Generator[dict[str, list]]]:
+    """Returns the column types of a table and a generator of column chunks."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    types: dict = dbf_queries.fetch_types(sourcepath)
+
+    if not condition:
+        chunks: Generator = dbf_queries.read_columns(sourcepath, size)
+    else:
+        matches: Generator = _match_rows(sourcepath, condition, types, False)
+        rows: Generator = (row for _, row in matches)
+        chunks: Generator = formatters.chunk_columns(rows, size)
+
+    return formatters.python_types(engine, types), chunks
 
 
 def update_rows(
@@ -68,16 +111,14 @@ def update_rows(
 
     row = formatters.assign_types(engine, types, row)
 
-    # get a sanitized list of rows
-    rows: list[dict] = dbf_queries.read(sourcepath)
-    rows = formatters.scourgify_rows(rows)
-
-    # manual filter of rows by condition
-    rows, indexes = formatters.filter_rows(rows, condition)
+    # filter the sanitized rows by condition while reading them
+    matches: list[tuple] = list(_match_rows(sourcepath, condition, types))
 
-    if not rows:
+    if not matches:
         raise RowNotFound(condition)
 
+    indexes, rows = zip(*matches)
+
     # update filtered rows by their index
     if validators.values_are_different(rows, row):
         dbf_queries.update(sourcepath, row, indexes)
@@ -89,15 +130,113 @@ def delete_rows(engine: str, source: str, condition: tuple) -> None:
     if not validators.path_exists(sourcepath):
         raise SourceNotFound(sourcepath)
 
-    rows: list[dict] = dbf_queries.read(sourcepath)
-    rows = formatters.scourgify_rows(rows)
+    indexes: list[int] = [index for index, _ in _match_rows(sourcepath, condition)]
 
-    rows, indexes = formatters.filter_rows(rows, condition)
-
-    if not rows:
+    if not indexes:
         raise RowNotFound(condition)
 
-    dbf_queries.delete(sourcepath, indexes)
+    dbf_queries.delete(sourcepath, indexes, _pack_threshold())
+
+
+def import_rows(
+    engine: str, source: str, rows: Iterable[dict], batch_size: int
+) -> Generator[int]:
+    """Appends a stream of rows in batches, yielding the size of each batch."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    rows = iter(rows)
+
+    if (first := next(rows, None)) is None:
+        return
+
+    types: dict = dbf_queries.fetch_types(sourcepath)
+    fields, coerce = formatters.compile_row_coercion(engine, types, first.keys())
+
+    batches: Iterable[list] = formatters.batch_rows(
+        itertools.chain([first], rows), batch_size
+    )
+
+    yield from dbf_queries.append_many(
+        sourcepath,
+        ([dict(zip(fields, row)) for row in coerce(batch)] for batch in batches),
+    )
+
+
+def stream_file(filepath: str) -> Generator[dict]:
+    """Yields the live rows of a DBF file found at any path."""
+
+    if not validators.path_exists(filepath):
+        raise SourceNotFound(filepath)
+
+    yield from dbf_queries.stream(filepath)
+
+
+def execute_operations(engine: str, source: str, operation: dict) -> None:
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    types: dict = dbf_queries.fetch_types(sourcepath)
+    inserts, updates, deletes = formatters.unpack_operation(engine, types, operation)
+
+    if keys := [key.lower() for key in operation.get("keys", [])]:
+        dbf_queries.execute_keyed(
+            sourcepath,
+            keys,
+            inserts,
+            updates,
+            deletes,
+            _pack_threshold(),
+            operation.get("upsert", False),
+        )
+    else:
+        dbf_queries.execute(sourcepath, inserts, updates, deletes, _pack_threshold())
+
+
+def pack_table(engine: str, source: str) -> int:
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    return dbf_queries.pack(sourcepath)
+
+
+def index_fields(engine: str, source: str, fields: Iterable[str]) -> int:
+    """Builds the sidecar index of each field, returning how many rows they hold."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    types: dict = dbf_queries.fetch_types(sourcepath)
+    rows: int = 0
+
+    for field in map(str.lower, fields):
+        if field not in types:
+            raise FieldNotFound(field)
+
+        if (rows := dbf_index.build(sourcepath, field)) is None:
+            raise FieldNotIndexable(field)
+
+    return rows
+
+
+def drop_indexes(engine: str, source: str, fields: Iterable[str]) -> int:
+    """Removes the indexes of some fields, or all of them, returning how many."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    return dbf_index.drop(sourcepath, [field.lower() for field in fields] or None)
 
 
 def drop_table(engine: str, source: str) -> None:
@@ -107,3 +246,55 @@ def drop_table(engine: str, source: str) -> None:
         raise SourceNotFound(sourcepath)
 
     file_manager.remove_file(sourcepath)
+    dbf_index.drop(sourcepath)
+
+
+def _match_rows(
+    sourcepath: str, condition: tuple, types: dict | None = None, indexed: bool = True
+) -> Generator[tuple[int | None, dict]]:
+    """
+    Yields the index and row of each match. A row_number equality reads its
+    record straight from the file, and a condition on an indexed field reads
+    the records found through its index, instead of scanning the table. Reads
+    that only want the rows can leave the indexes of the latter as None.
+    """
+
+    if (index := formatters.parse_position(condition)) is not None:
+        if row := dbf_queries.read_record(sourcepath, index):
+            yield index, row
+
+        return
+
+    types = types or dbf_queries.fetch_types(sourcepath)
+
+    matches: list | None = _match_indexed(sourcepath, condition, types, indexed)
+
+    if matches is not None:
+        yield from matches
+        return
+
+    rows: Generator[dict] = dbf_queries.stream(sourcepath)
+
+    yield from formatters.filter_stream(rows, condition, types)
+
+
+def _match_indexed(
+    sourcepath: str, condition: tuple, types: dict, indexed: bool
+) -> list[tuple[int | None, dict]] | None:
+    field, operator, value = condition
+    field = field.lower()
+
+    if field not in types or field not in dbf_index.indexed_fields(sourcepath):
+        return None
+
+    literal: any = predicates.coerce_value("DBF", field, types[field], value)
+
+    return dbf_queries.read_indexed(sourcepath, field, operator, literal, indexed)
+
+
+def _pack_threshold() -> float:
+    """Share of deleted records tolerated before a delete packs the table."""
+
+    settings: dict = {**config.DBF, **file_manager.load_config().get("dbf", {})}
+
+    return float(settings["pack_threshold"])
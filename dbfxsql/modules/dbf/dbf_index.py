@@ -0,0 +1,223 @@
+"""Sidecar indexes keeping the records of a DBF file sorted by a field"""
+
+import bisect
+import glob
+import heapq
+import os
+import struct
+from array import array
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+
+from . import dbf_reader, dbf_records
+
+
+# the file stamp an index was built for, followed by its record positions
+MAGIC: bytes = b"DBFXIDX1"
+STAMP: struct.Struct = struct.Struct("<QQIHH")
+EXTENSION: str = ".idx"
+
+OPERATORS: tuple[str, ...] = ("==", "=", "<", "<=", ">", ">=")
+
+# share of changed records past which an index is rebuilt instead of patched
+REBUILD_RATIO: float = 0.05
+
+
+def indexpath(sourcepath: str, field: str) -> str:
+    return f"{sourcepath}.{field}{EXTENSION}"
+
+
+def indexed_fields(sourcepath: str) -> list[str]:
+    prefix: str = f"{sourcepath}."
+    paths: list[str] = glob.glob(f"{glob.escape(prefix)}*{EXTENSION}")
+
+    return sorted(path[len(prefix) : -len(EXTENSION)] for path in paths)
+
+
+def build(sourcepath: str, field: str) -> int | None:
+    """
+    Indexes a field, returning how many records the index holds, or None when
+    the table can't be mapped to read them.
+    """
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        if not mapped:
+            return None
+
+        records: array = _sort(mapped, field)
+
+    _save(sourcepath, field, records)
+
+    return len(records)
+
+
+def drop(sourcepath: str, fields: list[str] | None = None) -> int:
+    """Removes the indexes of some fields, or all of them, returning how many."""
+
+    dropped: int = 0
+
+    for field in indexed_fields(sourcepath) if fields is None else fields:
+        if os.path.exists(path := indexpath(sourcepath, field)):
+            os.remove(path)
+            dropped += 1
+
+    return dropped
+
+
+def searcher(
+    mapped: dbf_reader.MappedTable, sourcepath: str, field: str
+) -> Callable[[str, any], list[int]] | None:
+    """
+    Loads the index of a field into a search of the positions of the records
+    comparing to a value, in file order, or returns None when the field isn't
+    indexed. An index left behind by a write from outside is rebuilt first.
+    """
+
+    if not os.path.exists(indexpath(sourcepath, field)):
+        return None
+
+    if (records := _load(sourcepath, field)) is None:
+        records = _sort(mapped, field)
+        _save(sourcepath, field, records)
+
+    key: Callable = _sort_key(mapped.getter(field))
+
+    def search(operator: str, value: any) -> list[int]:
+        try:
+            start, end = _span(records, key, operator, value)
+
+        except TypeError:  # values of another type never compare
+            return []
+
+        return sorted(records[start:end])
+
+    return search
+
+
+@contextmanager
+def track(sourcepath: str) -> Generator[set[int]]:
+    """
+    Keeps the indexes of a table valid across a write, which adds the records
+    it changed to the yielded set; the appended ones are found by themselves.
+    """
+
+    indexes: dict[str, array] = {
+        field: records
+        for field in indexed_fields(sourcepath)
+        if (records := _load(sourcepath, field)) is not None
+    }
+
+    count: int = dbf_records.read_header(sourcepath)[0] if indexes else 0
+    changed: set[int] = set()
+
+    yield changed
+
+    if indexes:
+        _patch(sourcepath, indexes, count, changed)
+
+
+def _patch(
+    sourcepath: str, indexes: dict[str, array], count: int, changed: set[int]
+) -> None:
+    """
+    Moves the changed and appended records of each index to their place, in a
+    single pass that drops the stale positions and merges them back sorted.
+    """
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        if not mapped:
+            return
+
+        stale: set[int] = {
+            position for position in changed if position < mapped.count
+        }.union(range(count, mapped.count))
+
+        for field, records in indexes.items():
+            if len(stale) > len(records) * REBUILD_RATIO or mapped.count < count:
+                records = _sort(mapped, field)
+            else:
+                key: Callable = _sort_key(mapped.getter(field))
+
+                kept: list[int] = [
+                    position for position in records if position not in stale
+                ]
+                moved: list[int] = sorted(
+                    (position for position in stale if not mapped.deleted(position)),
+                    key=key,
+                )
+
+                records = array("I", heapq.merge(kept, moved, key=key))
+
+            _save(sourcepath, field, records)
+
+
+def _sort(mapped: dbf_reader.MappedTable, field: str) -> array:
+    """Sorts the positions of the live records by their value of a field."""
+
+    entries: list[tuple] = sorted(
+        mapped.column(field), key=lambda entry: (entry[1] is not None, entry[1])
+    )
+
+    return array("I", (position for position, _ in entries))
+
+
+def _sort_key(get: Callable[[int], any]) -> Callable[[int], tuple]:
+    """Orders the positions by value, leaving the empty ones first."""
+
+    def key(position: int) -> tuple:
+        value: any = get(position)
+
+        return value is not None, value
+
+    return key
+
+
+def _span(
+    records: array, key: Callable, operator: str, value: any
+) -> tuple[int, int]:
+    """Bounds of the slice of records that compare to a value."""
+
+    # empty values never compare, so they're left out of every range
+    first: int = bisect.bisect_left(records, (True,), key=key)
+
+    low: int = bisect.bisect_left(records, (True, value), first, key=key)
+    high: int = bisect.bisect_right(records, (True, value), low, key=key)
+
+    return {
+        "==": (low, high),
+        "=": (low, high),
+        "<": (first, low),
+        "<=": (first, high),
+        ">": (high, len(records)),
+        ">=": (low, len(records)),
+    }[operator]
+
+
+def _load(sourcepath: str, field: str) -> array | None:
+    """Reads an index, unless the file changed since it was saved."""
+
+    header: bytes = MAGIC + STAMP.pack(*dbf_records.stamp(sourcepath))
+
+    try:
+        with open(indexpath(sourcepath, field), "rb") as file:
+            if header != file.read(len(header)):
+                return None
+
+            records: array = array("I")
+            records.frombytes(file.read())
+
+    except FileNotFoundError:
+        return None
+
+    return records
+
+
+def _save(sourcepath: str, field: str, records: array) -> None:
+    path: str = indexpath(sourcepath, field)
+    temporary: str = f"{path}.tmp"
+
+    with open(temporary, "wb") as file:
+        file.write(MAGIC + STAMP.pack(*dbf_records.stamp(sourcepath)))
+        records.tofile(file)
+
+    os.replace(temporary, path)
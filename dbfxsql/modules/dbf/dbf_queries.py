@@ -1,3 +1,7 @@
+import bisect
+from collections.abc import Callable, Generator, Iterable
+
+from . import dbf_index, dbf_reader, dbf_records
 from .dbf_connection import get_table
 
 import dbf
@@ -9,34 +13,258 @@ def create(sourcepath: str, fields: str) -> None:
 
 
 def insert(sourcepath: str, row: dict) -> None:
-    with get_table(sourcepath) as table:
+    with dbf_index.track(sourcepath), get_table(sourcepath) as table:
         table.append(row)
 
 
 def read(sourcepath: str) -> list[dict]:
+    with dbf_reader.open_table(sourcepath) as mapped:
+        if mapped:
+            rows: list[dict] = list(mapped.rows())
+
+            return rows if rows else [{field: "" for field in mapped.field_names}]
+
     with get_table(sourcepath) as table:
         field_names: list[str] = [field.lower() for field in table.field_names]
 
-        rows: list[dict] = [dict(zip(field_names, row)) for row in table]
+        rows: list[dict] = [
+            _scourgify(field_names, row) for row in table if not dbf.is_deleted(row)
+        ]
 
     return rows if rows else [{field: "" for field in field_names}]
 
 
-def update(sourcepath: str, row: dict, indexes: list[int]) -> None:
+def stream(sourcepath: str) -> Generator[dict]:
+    """Lazily yields the rows of a table, keeping a single batch in memory."""
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        if mapped:
+            yield from mapped.rows()
+            return
+
+    with get_table(sourcepath) as table:
+        field_names: list[str] = [field.lower() for field in table.field_names]
+
+        for row in table:
+            if not dbf.is_deleted(row):
+                yield _scourgify(field_names, row)
+
+
+def read_columns(sourcepath: str, size: int) -> Generator[dict[str, list]]:
+    """Lazily yields the live rows of a table in chunks of columns."""
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        if mapped:
+            yield from mapped.columns(size)
+            return
+
     with get_table(sourcepath) as table:
+        field_names: list[str] = [field.lower() for field in table.field_names]
+        columns: list[list] = [[] for _ in field_names]
+        count: int = 0
+
+        for row in table:
+            if dbf.is_deleted(row):
+                continue
+
+            for column, value in zip(columns, row):
+                column.append(value.rstrip() if isinstance(value, str) else value)
+
+            if (count := count + 1) == size:
+                yield dict(zip(field_names, columns))
+                columns, count = [[] for _ in field_names], 0
+
+        if count:
+            yield dict(zip(field_names, columns))
+
+
+def read_record(sourcepath: str, index: int) -> dict | None:
+    """Reads a single row straight from its record offset."""
+
+    deleted: list[int] = dbf_records.fetch_deleted(sourcepath)
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        if mapped:
+            if not 0 <= index < mapped.count - len(deleted):
+                return None
+
+            return mapped.record(dbf_records.physical_index(deleted, index))
+
+    with get_table(sourcepath) as table:
+        if not 0 <= index < len(table) - len(deleted):
+            return None
+
+        field_names: list[str] = [field.lower() for field in table.field_names]
+        record: dbf.Record = table[dbf_records.physical_index(deleted, index)]
+
+        return _scourgify(field_names, record)
+
+
+def read_indexed(
+    sourcepath: str, field: str, operator: str, value: any, indexed: bool = True
+) -> list[tuple[int | None, dict]] | None:
+    """
+    Reads the index and row of the live rows whose field compares to a value
+    through the index of the field, or returns None when it has none. Their
+    indexes are left as None unless asked for, as they need the deleted ones.
+    """
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        if not mapped or operator not in dbf_index.OPERATORS:
+            return None
+
+        if not (search := dbf_index.searcher(mapped, sourcepath, field)):
+            return None
+
+        deleted: list[int] = dbf_records.fetch_deleted(sourcepath) if indexed else []
+        matches: list[tuple[int | None, dict]] = []
+
+        for position in search(operator, value):
+            if (row := mapped.record(position)) is None:
+                continue
+
+            index: int | None = None
+
+            if indexed:
+                index = position - bisect.bisect_left(deleted, position)
+
+            matches.append((index, row))
+
+        return matches
+
+
+def update(sourcepath: str, row: dict, indexes: list[int]) -> None:
+    deleted: list[int] = dbf_records.fetch_deleted(sourcepath)
+
+    with dbf_index.track(sourcepath) as changed, get_table(sourcepath) as table:
         for index in indexes:
-            with table[index] as _row:
+            changed.add(position := dbf_records.physical_index(deleted, index))
+
+            with table[position] as _row:
                 for key, value in row.items():
                     setattr(_row, key, value)
 
 
-def delete(sourcepath: str, indexes: list[int]) -> None:
-    with get_table(sourcepath) as table:
+def delete(sourcepath: str, indexes: list[int], pack_threshold: float = 0.0) -> None:
+    deleted: list[int] = dbf_records.fetch_deleted(sourcepath)
+
+    with dbf_index.track(sourcepath) as changed, get_table(sourcepath) as table:
         for index in indexes:
-            with table[index] as row:
+            changed.add(position := dbf_records.physical_index(deleted, index))
+
+            with table[position] as row:
                 dbf.delete(row)
 
-        table.pack()
+        if _compact(table, len(deleted) + len(indexes), pack_threshold):
+            changed.update(range(len(table)))
+
+
+def execute(
+    sourcepath: str,
+    inserts: list[dict],
+    updates: list[tuple[int, dict]],
+    deletes: list[int],
+    pack_threshold: float = 0.0,
+) -> None:
+    """Applies a whole batch of row operations with a single open and pack."""
+
+    deleted: list[int] = dbf_records.fetch_deleted(sourcepath)
+
+    with dbf_index.track(sourcepath) as changed, get_table(sourcepath) as table:
+        for index, row in updates:
+            changed.add(position := dbf_records.physical_index(deleted, index))
+
+            with table[position] as _row:
+                for key, value in row.items():
+                    setattr(_row, key, value)
+
+        for index in deletes:
+            changed.add(position := dbf_records.physical_index(deleted, index))
+
+            with table[position] as row:
+                dbf.delete(row)
+
+        for row in inserts:
+            table.append(row)
+
+        if _compact(table, len(deleted) + len(deletes), pack_threshold):
+            changed.update(range(len(table)))
+
+
+def execute_keyed(
+    sourcepath: str,
+    keys: list[str],
+    inserts: list[dict],
+    updates: list[tuple[dict, dict]],
+    deletes: list[dict],
+    pack_threshold: float = 0.0,
+    upsert: bool = False,
+) -> None:
+    """
+    Applies a batch of row operations located by key, scanning the table once
+    to find the record of every key. An upsert appends the updated rows whose
+    key isn't found.
+    """
+
+    deleted: list[int] = dbf_records.fetch_deleted(sourcepath)
+    records: dict[tuple, int] = {}
+
+    if updates or deletes:
+        wanted: list[dict] = [key for key, _ in updates] + deletes
+        records = _locate_keys(sourcepath, keys, wanted)
+
+    with dbf_index.track(sourcepath) as changed, get_table(sourcepath) as table:
+        for key, row in updates:
+            if (index := records.get(tuple(key[field] for field in keys))) is None:
+                if upsert:
+                    table.append({**key, **row})
+
+                continue
+
+            changed.add(index)
+
+            with table[index] as record:
+                for field, value in row.items():
+                    setattr(record, field, value)
+
+        for key in deletes:
+            if (index := records.get(tuple(key[field] for field in keys))) is None:
+                continue
+
+            changed.add(index)
+
+            with table[index] as record:
+                dbf.delete(record)
+
+        for row in inserts:
+            table.append(row)
+
+        if _compact(table, len(deleted) + len(deletes), pack_threshold):
+            changed.update(range(len(table)))
+
+
+def append_many(sourcepath: str, batches: Iterable[list[dict]]) -> Generator[int]:
+    """Appends batches of rows with a single open, yielding each batch size."""
+
+    with dbf_index.track(sourcepath), get_table(sourcepath) as table:
+        for batch in batches:
+            for row in batch:
+                table.append(row)
+
+            yield len(batch)
+
+
+def pack(sourcepath: str) -> int:
+    """Removes the records flagged as deleted, returning how many were."""
+
+    deleted: list[int] = dbf_records.fetch_deleted(sourcepath)
+
+    if deleted:
+        with dbf_index.track(sourcepath) as changed, get_table(sourcepath) as table:
+            table.pack()
+            changed.update(range(len(table)))
+
+    return len(deleted)
 
 
 def fetch_types(sourcepath) -> dict[str, str]:
@@ -49,3 +277,69 @@ def fetch_types(sourcepath) -> dict[str, str]:
             data_structure.append(table._field_layout(i).split(" ")[-1][0])
 
     return dict(zip(names, data_structure))
+
+
+def _locate_keys(
+    sourcepath: str, keys: list[str], wanted: list[dict]
+) -> dict[tuple, int]:
+    """
+    Maps the key of each live row to its record position, or only the wanted
+    ones when their single key field is indexed.
+    """
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        if mapped and 1 == len(keys):
+            search: Callable | None = dbf_index.searcher(mapped, sourcepath, keys[0])
+
+            if search:
+                return _search_keys(mapped, search, keys[0], wanted)
+
+        if mapped:
+            return mapped.keys(keys)
+
+    records: dict[tuple, int] = {}
+
+    with get_table(sourcepath) as table:
+        for index, record in enumerate(table):
+            if not dbf.is_deleted(record):
+                key: tuple = tuple(_strip(record[field]) for field in keys)
+                records.setdefault(key, index)
+
+    return records
+
+
+def _search_keys(
+    mapped: dbf_reader.MappedTable, search: Callable, field: str, wanted: list[dict]
+) -> dict[tuple, int]:
+    records: dict[tuple, int] = {}
+
+    for key in wanted:
+        for position in search("==", key[field]):
+            if not mapped.deleted(position):
+                records.setdefault((key[field],), position)
+                break
+
+    return records
+
+
+def _scourgify(field_names: list[str], row: dbf.Record) -> dict:
+    """Maps a record to lowercase fields with right-stripped values."""
+
+    return {field: _strip(value) for field, value in zip(field_names, row)}
+
+
+def _strip(value: any) -> any:
+    return value.rstrip() if isinstance(value, str) else value
+
+
+def _compact(table: dbf.Table, deleted: int, pack_threshold: float) -> bool:
+    """
+    Packs the table when its share of deleted records exceeds the threshold,
+    returning if it did.
+    """
+
+    if deleted and deleted / len(table) > pack_threshold:
+        table.pack()
+        return True
+
+    return False
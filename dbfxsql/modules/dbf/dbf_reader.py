@@ -0,0 +1,303 @@
+"""Read-only access decoding DBF records straight from a memory map"""
+
+import datetime
+import functools
+import itertools
+import mmap
+import struct
+from collections.abc import Callable, Generator, Iterator
+from contextlib import contextmanager
+from decimal import Decimal
+
+from . import dbf_records
+from dbf.tables import code_pages
+
+
+# name, type, length, decimals and flags of a field descriptor
+FIELD: struct.Struct = struct.Struct("<11sc4xBBB13x")
+TERMINATOR: int = 0x0D
+VISUAL_FOXPRO: tuple[int, ...] = (0x30, 0x31, 0x32)
+
+# flags of the fields whose values the dbf package doesn't return as text
+NULLABLE_OR_BINARY: int = 0x06
+
+# anything else, like "?" or a blank, is an unknown logical
+LOGICALS: dict[bytes, bool] = {
+    **dict.fromkeys((b"t", b"T", b"y", b"Y"), True),
+    **dict.fromkeys((b"f", b"F", b"n", b"N"), False),
+}
+
+TIMESTAMP: struct.Struct = struct.Struct("<ii")
+VFPTIME: int = 1721425
+BATCH_SIZE: int = 4096
+
+
+class MappedTable:
+    """Decodes the records of a DBF file with a precompiled struct layout."""
+
+    __slots__ = ("buffer", "field_names", "layout", "decoders", "start", "count")
+
+    def __init__(
+        self,
+        buffer: mmap.mmap,
+        field_names: list[str],
+        layout: struct.Struct,
+        decoders: list[Callable | None],
+        start: int,
+        count: int,
+    ) -> None:
+        self.buffer = buffer
+        self.field_names = field_names
+        self.layout = layout
+        self.decoders = decoders
+        self.start = start
+        self.count = count
+
+    def records(self) -> Generator[tuple]:
+        """Yields the raw values of every record, led by its deletion flag."""
+
+        end: int = self.start + self.count * self.layout.size
+
+        with memoryview(self.buffer)[self.start : end] as view:
+            yield from self.layout.iter_unpack(view)
+
+    def columns(self, size: int) -> Generator[dict[str, list]]:
+        """Yields the live rows in chunks of decoded columns."""
+
+        records: Iterator[tuple] = self.records()
+
+        while batch := list(itertools.islice(records, size)):
+            live: list[tuple] = [
+                record for record in batch if dbf_records.DELETED != record[0]
+            ]
+
+            if live:
+                yield dict(zip(self.field_names, self._decode(live)))
+
+    def rows(self) -> Generator[dict]:
+        """Yields the live rows, decoding a batch of records at a time."""
+
+        for chunk in self.columns(BATCH_SIZE):
+            for row in zip(*chunk.values()):
+                yield dict(zip(self.field_names, row))
+
+    def record(self, position: int) -> dict | None:
+        """Decodes the record at a position, unless it is flagged as deleted."""
+
+        offset: int = self.start + position * self.layout.size
+        record: tuple = self.layout.unpack_from(self.buffer, offset)
+
+        if dbf_records.DELETED == record[0]:
+            return None
+
+        values: list = [value[0] for value in self._decode([record])]
+
+        return dict(zip(self.field_names, values))
+
+    def deleted(self, position: int) -> bool:
+        """Tells if the record at a position is flagged as deleted."""
+
+        offset: int = self.start + position * self.layout.size
+
+        return dbf_records.DELETED == self.buffer[offset : offset + 1]
+
+    def column(self, field: str) -> Generator[tuple[int, any]]:
+        """Yields the position and decoded value of a field in each live record."""
+
+        column: int = self.field_names.index(field) + 1
+        decoder: Callable | None = self.decoders[column - 1]
+
+        for position, record in enumerate(self.records()):
+            if dbf_records.DELETED != record[0]:
+                yield position, _decode(decoder, record[column])
+
+    def getter(self, field: str) -> Callable[[int], any]:
+        """Compiles a reader of the decoded value of a field at a position."""
+
+        column: int = self.field_names.index(field) + 1
+        decoder: Callable | None = self.decoders[column - 1]
+        layout: struct.Struct = self.layout
+
+        def get(position: int) -> any:
+            offset: int = self.start + position * layout.size
+
+            return _decode(decoder, layout.unpack_from(self.buffer, offset)[column])
+
+        return get
+
+    def keys(self, fields: list[str]) -> dict[tuple, int]:
+        """Maps the values of some fields to the first live record holding them."""
+
+        columns: list[int] = [self.field_names.index(field) + 1 for field in fields]
+        keys: dict[tuple, int] = {}
+
+        for position, record in enumerate(self.records()):
+            if dbf_records.DELETED != record[0]:
+                key: tuple = tuple(
+                    _decode(self.decoders[column - 1], record[column])
+                    for column in columns
+                )
+                keys.setdefault(key, position)
+
+        return keys
+
+    def _decode(self, records: list[tuple]) -> list[list]:
+        """Transposes records into columns, decoding the values of each one."""
+
+        columns: list[tuple] = list(zip(*records))[1:]
+
+        return [
+            list(map(decoder, column)) if decoder else list(column)
+            for decoder, column in zip(self.decoders, columns)
+        ]
+
+
+@contextmanager
+def open_table(sourcepath: str) -> Generator[MappedTable | None]:
+    """
+    Maps a DBF file to read its records, yielding None when the file is empty
+    or holds fields that only the dbf package knows how to decode.
+    """
+
+    record_count, header_length, record_length = dbf_records.read_header(sourcepath)
+
+    if not header_length:
+        yield None
+        return
+
+    with (
+        open(sourcepath, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        table: MappedTable | None = _map_table(buffer, header_length, record_length)
+
+        if table:
+            # a file cut short only holds the records that fit in it
+            records: int = (len(buffer) - header_length) // record_length
+            table.count = min(record_count, max(records, 0))
+
+        yield table
+
+
+def _map_table(
+    buffer: mmap.mmap, header_length: int, record_length: int
+) -> MappedTable | None:
+    """Compiles the struct layout and decoders of the fields of a table."""
+
+    version: int = buffer[0]
+    codec: str = code_pages.get(buffer[29], code_pages[0x00])[0]
+
+    field_names: list[str] = []
+    formats: list[str] = ["<c"]
+    decoders: list[Callable | None] = []
+    width: int = 1
+
+    for offset in range(32, header_length - FIELD.size + 1, FIELD.size):
+        if TERMINATOR == buffer[offset]:
+            break
+
+        name, _type, length, decimals, flags = FIELD.unpack_from(buffer, offset)
+        compiled: tuple | None = _compile_field(
+            _type.decode("ascii").upper(), length, decimals, codec, version
+        )
+
+        if not compiled or flags & NULLABLE_OR_BINARY:
+            return None
+
+        field_names.append(name.split(b"\x00")[0].decode("ascii").lower())
+        formats.append(compiled[0])
+        decoders.append(compiled[1])
+        width += length
+
+    if width > record_length:
+        return None
+
+    formats.append(f"{record_length - width}x")
+
+    return MappedTable(
+        buffer,
+        field_names,
+        struct.Struct("".join(formats)),
+        decoders,
+        header_length,
+        0,
+    )
+
+
+def _compile_field(
+    _type: str, length: int, decimals: int, codec: str, version: int
+) -> tuple[str, Callable | None] | None:
+    """Returns the struct format and decoder of a field, if it can be mapped."""
+
+    if "C" == _type:
+        return f"{length}s", lambda value: value.decode(codec).rstrip()
+
+    if _type in ("N", "F"):
+        return f"{length}s", _numeric_decoder(decimals)
+
+    if "L" == _type and 1 == length:
+        return "c", LOGICALS.get
+
+    if "D" == _type and 8 == length:
+        return "8s", _date
+
+    if version not in VISUAL_FOXPRO:
+        return None
+
+    if "I" == _type and 4 == length:
+        return "i", None
+
+    if "B" == _type and 8 == length:
+        return "d", None
+
+    if "Y" == _type and 8 == length:
+        return "q", _currency
+
+    if "T" == _type and 8 == length:
+        return "8s", _timestamp
+
+    return None
+
+
+def _decode(decoder: Callable | None, value: any) -> any:
+    return decoder(value) if decoder else value
+
+
+def _numeric_decoder(decimals: int) -> Callable[[bytes], int | float | None]:
+    cast: type = float if decimals else int
+
+    def decode(value: bytes) -> int | float | None:
+        try:
+            return cast(value)
+
+        except ValueError:
+            value = value.replace(b"\x00", b"").strip()
+
+        # blanks and asterisks (an overflowed value) are both empty
+        return cast(value) if value and not value.startswith(b"*") else None
+
+    return decode
+
+
+@functools.lru_cache(maxsize=4096)
+def _date(value: bytes) -> datetime.date | None:
+    if value in (b"        ", b"00000000"):
+        return None
+
+    return datetime.date(int(value[:4]), int(value[4:6]), int(value[6:]))
+
+
+def _currency(value: int) -> Decimal:
+    return Decimal(f"{value}e-4")
+
+
+def _timestamp(value: bytes) -> datetime.datetime | None:
+    if not any(value):
+        return None
+
+    days, milliseconds = TIMESTAMP.unpack(value)
+    date: datetime.date = datetime.date.fromordinal(max(days - VFPTIME, 1))
+
+    return datetime.datetime.combine(date, datetime.time()) + datetime.timedelta(
+        milliseconds=milliseconds
+    )
@@ -0,0 +1,86 @@
+"""Raw access to the fixed-width records of a DBF file"""
+
+import bisect
+import mmap
+import os
+import struct
+
+
+# record count, header length and record length, after the version and date
+HEADER: struct.Struct = struct.Struct("<4xIHH")
+DELETED: bytes = b"*"
+
+# deleted positions by file path, with the stamp of the file they were read from
+_deleted: dict[str, tuple[tuple, list[int]]] = {}
+
+
+def read_header(sourcepath: str) -> tuple[int, int, int]:
+    """Returns the record count, header length and record length of a file."""
+
+    with open(sourcepath, "rb") as file:
+        data: bytes = file.read(HEADER.size)
+
+    return HEADER.unpack(data) if HEADER.size == len(data) else (0, 0, 0)
+
+
+def stamp(sourcepath: str) -> tuple:
+    """Tells apart the versions of a file by its stat and header."""
+
+    stats: os.stat_result = os.stat(sourcepath)
+
+    return stats.st_mtime_ns, stats.st_size, *read_header(sourcepath)
+
+
+def fetch_deleted(sourcepath: str) -> list[int]:
+    """
+    Returns the sorted positions of the records flagged as deleted, reading
+    the flags of every record again only once the file changed.
+    """
+
+    path: str = os.path.abspath(sourcepath)
+    current: tuple = stamp(path)
+
+    cached, deleted = _deleted.get(path, (None, None))
+
+    if current != cached:
+        deleted = _read_deleted(path)
+        _deleted[path] = (current, deleted)
+
+    return deleted
+
+
+def _read_deleted(sourcepath: str) -> list[int]:
+    record_count, header_length, record_length = read_header(sourcepath)
+
+    if not record_count or os.path.getsize(sourcepath) <= header_length:
+        return []
+
+    end: int = header_length + record_count * record_length
+
+    with (
+        open(sourcepath, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        # the first byte of each record holds its deletion flag
+        flags: bytes = buffer[header_length:end:record_length]
+
+    deleted: list[int] = []
+    position: int = flags.find(DELETED)
+
+    while -1 != position:
+        deleted.append(position)
+        position = flags.find(DELETED, position + 1)
+
+    return deleted
+
+
+def physical_index(deleted: list[int], index: int) -> int:
+    """Translates the index of a live row into its record position."""
+
+    position: int = index
+
+    # skip every deleted record found up to the position
+    while (skipped := bisect.bisect_right(deleted, position)) != position - index:
+        position = index + skipped
+
+    return position
@@ -0,0 +1,111 @@
+"""Framed JSON messages exchanged over a Unix domain socket"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+from collections.abc import Callable, Generator
+from contextlib import contextmanager, suppress
+
+from dbfxsql.exceptions.serve_errors import ServerAlreadyRunning
+
+
+# every message is its UTF-8 JSON body led by the length of the body
+HEADER: struct.Struct = struct.Struct("!I")
+
+# seconds a client can keep the server waiting on a read or write of its own
+TIMEOUT: float = 10.0
+
+
+def connect(socketpath: str) -> socket.socket | None:
+    """Connects to the server of a socket, or returns None if none is listening."""
+
+    connection: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        connection.connect(socketpath)
+
+    except (FileNotFoundError, ConnectionRefusedError):
+        connection.close()
+        return None
+
+    return connection
+
+
+@contextmanager
+def listen(
+    socketpath: str, handle: Callable[[socket.socket], None]
+) -> Generator[socketserver.UnixStreamServer]:
+    """
+    Binds a server handling one connection at a time, replacing the socket
+    file left behind by a server that stopped without removing it. A client
+    that stalls past the timeout is dropped, so it can't hold up the others.
+    """
+
+    if connection := connect(socketpath):
+        connection.close()
+        raise ServerAlreadyRunning(socketpath)
+
+    with suppress(FileNotFoundError):
+        os.remove(socketpath)
+
+    os.makedirs(os.path.dirname(socketpath), exist_ok=True)
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            self.request.settimeout(TIMEOUT)
+
+            with suppress(TimeoutError):
+                handle(self.request)
+
+    # only the user running the server can connect to it
+    umask: int = os.umask(0o177)
+
+    try:
+        server: socketserver.UnixStreamServer = socketserver.UnixStreamServer(
+            socketpath, Handler
+        )
+
+    finally:
+        os.umask(umask)
+
+    try:
+        with server:
+            yield server
+
+    finally:
+        with suppress(FileNotFoundError):
+            os.remove(socketpath)
+
+
+def send(connection: socket.socket, message: dict) -> None:
+    # values without a JSON type are sent as they print
+    body: bytes = json.dumps(message, default=str).encode()
+
+    connection.sendall(HEADER.pack(len(body)) + body)
+
+
+def receive(connection: socket.socket) -> dict | None:
+    """Reads the next message, or returns None once the peer closed."""
+
+    if not (header := _read(connection, HEADER.size)):
+        return None
+
+    length: int = HEADER.unpack(header)[0] if HEADER.size == len(header) else -1
+
+    if len(body := _read(connection, length)) != length:
+        raise ConnectionError("Connection closed in the middle of a message.")
+
+    return json.loads(body)
+
+
+def _read(connection: socket.socket, size: int) -> bytes:
+    """Reads a number of bytes, or fewer if the peer closed before sending them."""
+
+    buffer: bytearray = bytearray()
+
+    while len(buffer) < size and (chunk := connection.recv(size - len(buffer))):
+        buffer += chunk
+
+    return bytes(buffer)
@@ -0,0 +1,118 @@
+"""Resident server running the commands of the CLI with their caches warm"""
+
+import io
+import os
+import socket
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+
+import click
+
+from . import serve_connection
+
+
+# commands answered without a prompt, which the server can run for a client
+COMMANDS: tuple[str, ...] = (
+    "create",
+    "insert",
+    "read",
+    "update",
+    "delete",
+    "pack",
+    "index",
+)
+
+
+def serve(socketpath: str, group: click.Group) -> None:
+    """
+    Runs the command lines sent to a socket through a command group, in this
+    process, so the config, schemas, tables and connections stay loaded.
+    """
+
+    def handle(connection: socket.socket) -> None:
+        while (message := serve_connection.receive(connection)) is not None:
+            serve_connection.send(connection, execute(group, message))
+
+    with serve_connection.listen(socketpath, handle) as server:
+        server.serve_forever()
+
+
+def forward(socketpath: str, args: list[str]) -> dict | None:
+    """
+    Runs a command line in the server of a socket from the current folder,
+    returning its output and exit status, or None when it can't be served.
+    Exports to stdout aren't, as the reply would hold all of their rows.
+    """
+
+    if not args or args[0] not in COMMANDS or _exports(args):
+        return None
+
+    if not (connection := serve_connection.connect(socketpath)):
+        return None
+
+    with connection:
+        serve_connection.send(connection, {"args": args, "cwd": os.getcwd()})
+
+        if (reply := serve_connection.receive(connection)) is None:
+            raise ConnectionError("Server closed the connection.")
+
+    return reply
+
+
+def execute(group: click.Group, message: dict) -> dict:
+    """Runs a command line as the CLI would, capturing its output and status."""
+
+    args: list[str] = message["args"]
+
+    if not args or args[0] not in COMMANDS:
+        error: str = f"Error: Command '{" ".join(args[:1])}' can't be served.\n"
+        return {"status": 2, "stdout": "", "stderr": error}
+
+    stdout: io.StringIO = io.StringIO()
+    stderr: io.StringIO = io.StringIO()
+
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        status: int = _run(group, args, message["cwd"])
+
+    return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def _run(group: click.Group, args: list[str], cwd: str) -> int:
+    try:
+        os.chdir(cwd)
+        group.main(args, prog_name="dbfxsql")
+
+    except SystemExit as exit:
+        # custom errors exit with themselves, which Python would print
+        if exit.code is None or isinstance(exit.code, int):
+            return exit.code or 0
+
+        print(exit.code, file=sys.stderr)
+        return 1
+
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+def _exports(args: list[str]) -> bool:
+    """Whether a command line is a read exporting its rows to stdout."""
+
+    if "read" != args[0]:
+        return False
+
+    _format: str = "table"
+
+    for option, value in zip(args, args[1:] + [""]):
+        if option.startswith(("-o", "--output")):
+            return False
+
+        if option in ("-F", "--format"):
+            _format = value
+        elif option.startswith(("-F", "--format=")):
+            _format = option.removeprefix("--format=").removeprefix("-F")
+
+    return "table" != _format.lower()
@@ -0,0 +1,138 @@
+"""Change capture of the tables of a database through triggers"""
+
+import json
+
+from . import sql_connection, sql_schema
+
+
+CHANGELOG: str = "_dbfxsql_changelog"
+OPERATIONS: tuple[str, ...] = ("insert", "update", "delete")
+
+
+def install(sourcepath: str, table: str) -> bool:
+    """
+    Installs the triggers logging the changes of a table, or replaces them if
+    its fields changed. Returns if they were already logging its changes.
+    """
+
+    triggers: dict[str, str] = _triggers(sourcepath, table)
+
+    if _installed(sourcepath, table) == triggers:
+        return True
+
+    statements: list[tuple[str, tuple]] = [
+        (
+            f"""CREATE TABLE IF NOT EXISTS {CHANGELOG} (
+            seq INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            record INTEGER NOT NULL,
+            operation TEXT NOT NULL,
+            old TEXT
+            )""",
+            (),
+        ),
+        (
+            f"CREATE INDEX IF NOT EXISTS {CHANGELOG}_name ON {CHANGELOG} (name, seq)",
+            (),
+        ),
+    ]
+
+    for name, trigger in triggers.items():
+        statements += [(f"DROP TRIGGER IF EXISTS {name}", ()), (trigger, ())]
+
+    sql_connection.fetch_script(sourcepath, statements)
+    sql_schema.invalidate(sourcepath)
+
+    return False
+
+
+def uninstall(sourcepath: str, table: str) -> None:
+    """Drops the triggers of a table along with the changes they logged."""
+
+    if not (installed := _installed(sourcepath, table)):
+        return
+
+    statements: list[tuple[str, tuple]] = [
+        (f"DROP TRIGGER IF EXISTS {name}", ()) for name in installed
+    ]
+    statements.append((f"DELETE FROM {CHANGELOG} WHERE name = ?", (table,)))
+
+    sql_connection.fetch_script(sourcepath, statements)
+    sql_schema.invalidate(sourcepath)
+
+
+def consume(sourcepath: str, table: str) -> tuple[int, list[dict], list[dict]]:
+    """
+    Returns the sequence of the last logged change of a table, the current
+    rows of the records it changed and the former values of the records that
+    were updated or deleted, all read from the same state of the database.
+    """
+
+    logged, rows = sql_connection.fetch_snapshot(
+        sourcepath,
+        [
+            (
+                f"SELECT seq, old FROM {CHANGELOG} WHERE name = ? ORDER BY seq",
+                (table,),
+            ),
+            (
+                f"""SELECT * FROM {table} WHERE rowid IN (
+                SELECT record FROM {CHANGELOG} WHERE name = ?
+                )""",
+                (table,),
+            ),
+        ],
+    )
+
+    seq: int = logged[-1]["seq"] if logged else 0
+    removed: list[dict] = [json.loads(log["old"]) for log in logged if log["old"]]
+
+    return seq, rows, removed
+
+
+def truncate(sourcepath: str, table: str, seq: int) -> None:
+    """Forgets the logged changes of a table up to a sequence."""
+
+    query: str = f"DELETE FROM {CHANGELOG} WHERE name = :name AND seq <= :seq"
+
+    sql_connection.fetch_none(sourcepath, query, {"name": table, "seq": seq})
+
+
+def _installed(sourcepath: str, table: str) -> dict[str, str]:
+    query: str = """
+    SELECT name, sql FROM sqlite_master
+    WHERE type = 'trigger' AND tbl_name = ? AND name LIKE '\\_dbfxsql\\_%' ESCAPE '\\'
+    """
+
+    triggers: list[dict] = sql_connection.fetch_all(sourcepath, query, (table,))
+
+    return {trigger["name"]: trigger["sql"] for trigger in triggers if trigger["name"]}
+
+
+def _triggers(sourcepath: str, table: str) -> dict[str, str]:
+    """Builds the triggers logging the record and former values of each change."""
+
+    fields: list[str] = list(sql_schema.fetch_tables(sourcepath)[table]["types"])
+
+    # blobs can't be held by JSON, so their hexadecimal digits are logged
+    old: str = ", ".join(
+        f"'{field}', CASE typeof(OLD.{field}) "
+        f"WHEN 'blob' THEN hex(OLD.{field}) ELSE OLD.{field} END"
+        for field in fields
+    )
+
+    values: dict[str, str] = {
+        "insert": f"'{table}', NEW.rowid, 'insert', NULL",
+        "update": f"'{table}', NEW.rowid, 'update', json_object({old})",
+        "delete": f"'{table}', OLD.rowid, 'delete', json_object({old})",
+    }
+
+    return {
+        f"_dbfxsql_{table}_{operation}": (
+            f"CREATE TRIGGER _dbfxsql_{table}_{operation} "
+            f"AFTER {operation.upper()} ON {table} BEGIN "
+            f"INSERT INTO {CHANGELOG} (name, record, operation, old) "
+            f"VALUES ({values[operation]}); END"
+        )
+        for operation in OPERATIONS
+    }
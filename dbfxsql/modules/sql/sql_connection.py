@@ -1,15 +1,30 @@
 """Communications with the SQL database"""
 
+import atexit
+import os
 import sqlite3
-from collections.abc import Generator
+import threading
+from collections.abc import Generator, Iterable
 from contextlib import contextmanager
 
+from dbfxsql.constants import config
+from dbfxsql.helpers import file_manager
 
-def fetch_all(sourcepath: str, query: str) -> list[dict]:
+
+PRAGMAS: tuple[str, ...] = ("journal_mode", "synchronous", "cache_size", "mmap_size")
+
+# long-lived connections by database path, each one guarded by its own lock
+_pool: dict[str, tuple[sqlite3.Connection, threading.RLock, tuple]] = {}
+_pool_lock: threading.Lock = threading.Lock()
+
+
+def fetch_all(
+    sourcepath: str, query: str, parameters: tuple | dict = ()
+) -> list[dict]:
     """Executes a query returning all rows in the found set"""
 
     with _get_cursor(sourcepath) as cursor:
-        cursor.execute(query)
+        cursor.execute(query, parameters)
 
         fields: list[str] = [description[0] for description in cursor.description]
 
@@ -18,11 +33,13 @@ def fetch_all(sourcepath: str, query: str) -> list[dict]:
     return rows if rows else [{field: "" for field in fields}]
 
 
-def fetch_one(sourcepath: str, query: str) -> list[dict] | None:
+def fetch_one(
+    sourcepath: str, query: str, parameters: tuple | dict = ()
+) -> list[dict] | None:
     """Executes a query and returns the first row as a dictionary (or None)."""
 
     with _get_cursor(sourcepath) as cursor:
-        cursor.execute(query)
+        cursor.execute(query, parameters)
 
         fields: list[str] = [description[0] for description in cursor.description]
 
@@ -30,6 +47,20 @@ def fetch_one(sourcepath: str, query: str) -> list[dict] | None:
             return [dict(zip(fields, row))]
 
 
+def fetch_chunks(
+    sourcepath: str, query: str, size: int, parameters: tuple | dict = ()
+) -> Generator[dict[str, list]]:
+    """Executes a query yielding its found set in chunks of columns."""
+
+    with _get_cursor(sourcepath) as cursor:
+        cursor.execute(query, parameters)
+
+        fields: list[str] = [description[0] for description in cursor.description]
+
+        while rows := cursor.fetchmany(size):
+            yield dict(zip(fields, map(list, zip(*rows))))
+
+
 def fetch_none(sourcepath: str, query: str, parameters: dict | None = None) -> None:
     """Executes a query that doesn't return values."""
 
@@ -37,15 +68,164 @@ def fetch_none(sourcepath: str, query: str, parameters: dict | None = None) -> N
         cursor.execute(query, parameters) if parameters else cursor.execute(query)
 
 
+def fetch_batch(sourcepath: str, statements: list[tuple[str, list]]) -> None:
+    """Executes groups of parametrized queries in a single transaction."""
+
+    with _get_cursor(sourcepath) as cursor:
+        for query, parameters in statements:
+            cursor.executemany(query, parameters)
+
+
+def fetch_many(
+    sourcepath: str, query: str, batches: Iterable[list]
+) -> Generator[int]:
+    """
+    Executes a parametrized query over batches of rows in a single
+    transaction, yielding the size of each batch once it's written.
+    """
+
+    with _get_cursor(sourcepath) as cursor:
+        for parameters in batches:
+            cursor.executemany(query, parameters)
+
+            yield len(parameters)
+
+
+def fetch_snapshot(
+    sourcepath: str, queries: list[tuple[str, tuple | dict]]
+) -> list[list[dict]]:
+    """Executes several queries reading the same state of the database."""
+
+    results: list[list[dict]] = []
+
+    with _get_cursor(sourcepath) as cursor:
+        cursor.execute("BEGIN")
+
+        for query, parameters in queries:
+            cursor.execute(query, parameters)
+
+            fields: list[str] = [description[0] for description in cursor.description]
+            results.append([dict(zip(fields, row)) for row in cursor.fetchall()])
+
+    return results
+
+
+def fetch_script(
+    sourcepath: str, statements: list[tuple[str, tuple | dict]]
+) -> None:
+    """Executes several statements, like schema changes, in one transaction."""
+
+    with _get_cursor(sourcepath) as cursor:
+        cursor.execute("BEGIN")
+
+        for statement, parameters in statements:
+            cursor.execute(statement, parameters)
+
+
+def fetch_version(sourcepath: str) -> tuple:
+    """
+    Returns a version of the database that changes whenever the pooled
+    connection or any other one writes to it or changes its schema.
+    """
+
+    connection, lock = _get_connection(sourcepath)
+
+    with lock:
+        data_version, schema_version = (
+            connection.execute("PRAGMA data_version").fetchone()[0],
+            connection.execute("PRAGMA schema_version").fetchone()[0],
+        )
+
+        return id(connection), data_version, schema_version, connection.total_changes
+
+
+def close(sourcepath: str | None = None) -> None:
+    """Closes the pooled connection of a database, or all of them."""
+
+    with _pool_lock:
+        keys: list[str] = [_pool_key(sourcepath)] if sourcepath else list(_pool)
+
+        for key in keys:
+            if pooled := _pool.pop(key, None):
+                connection, lock, _ = pooled
+
+                with lock:
+                    connection.close()
+
+
 @contextmanager
 def _get_cursor(sourcepath: str) -> Generator[sqlite3.Cursor]:
-    """Provides a context manager for establishing and closing a database connection."""
+    """Provides a context manager for borrowing a pooled database connection."""
+
+    connection, lock = _get_connection(sourcepath)
+
+    with lock:
+        cursor: sqlite3.Cursor = connection.cursor()
+        try:
+            yield cursor
+            connection.commit()
+        except BaseException:  # interrupted batches are rolled back too
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def _get_connection(sourcepath: str) -> tuple[sqlite3.Connection, threading.RLock]:
+    """Returns the pooled connection of a database, reopening it if replaced."""
+
+    key: str = _pool_key(sourcepath)
+    identity: tuple = _file_identity(key)
+
+    with _pool_lock:
+        if pooled := _pool.get(key):
+            connection, lock, _identity = pooled
+
+            if identity == _identity:
+                return connection, lock
+
+            with lock:
+                connection.close()
+
+        connection, lock = _connect(key), threading.RLock()
+        _pool[key] = connection, lock, _file_identity(key)
+
+    return connection, lock
+
+
+def _connect(sourcepath: str) -> sqlite3.Connection:
+    settings: dict = {**config.SQLITE, **file_manager.load_config().get("sqlite", {})}
+
+    connection: sqlite3.Connection = sqlite3.connect(
+        sourcepath,
+        check_same_thread=False,
+        cached_statements=int(settings["cached_statements"]),
+    )
+
+    for pragma in PRAGMAS:
+        value: str = str(settings[pragma])
+
+        if not value.lstrip("-").isalnum():
+            raise ValueError(f"Invalid value '{value}' for pragma '{pragma}'.")
+
+        connection.execute(f"PRAGMA {pragma} = {value}")
+
+    return connection
+
+
+def _pool_key(sourcepath: str) -> str:
+    return os.path.abspath(sourcepath)
+
+
+def _file_identity(sourcepath: str) -> tuple:
+    """Device and inode of a database, to notice when it's deleted or replaced."""
 
-    connection: sqlite3.Connection = sqlite3.connect(sourcepath)
-    cursor: sqlite3.Cursor = connection.cursor()
     try:
-        yield cursor
-        connection.commit()
-    finally:
-        cursor.close()
-        connection.close()
+        stat: os.stat_result = os.stat(sourcepath)
+    except FileNotFoundError:
+        return ()
+
+    return stat.st_dev, stat.st_ino
+
+
+atexit.register(close)
@@ -1,10 +1,12 @@
-from collections.abc import Iterable
+import itertools
+from collections.abc import Generator, Iterable
 
-from . import sql_queries
+from . import sql_changelog, sql_connection, sql_positions, sql_queries, sql_schema
 from dbfxsql.helpers import file_manager, formatters, validators
 from dbfxsql.exceptions.source_errors import SourceNotFound
 from dbfxsql.exceptions.row_errors import RowAlreadyExists, RowNotFound
 from dbfxsql.exceptions.field_errors import FieldReserved
+from dbfxsql.exceptions.table_errors import TableNotFound
 
 
 def create_table(engine: str, source: str, table: str, fields: Iterable[tuple]) -> None:
@@ -28,7 +30,6 @@ def insert_row(engine: str, source: str, table: str, fields: Iterable[tuple]) ->
         raise SourceNotFound(sourcepath)
 
     types: dict = sql_queries.fetch_types(sourcepath, table)
-    types = formatters.scourgify_types(types)
 
     row: dict = formatters.fields_to_dict(fields)
     row = formatters.assign_types(engine, types, row)
@@ -36,7 +37,7 @@ def insert_row(engine: str, source: str, table: str, fields: Iterable[tuple]) ->
     primary_key: str = sql_queries.fetch_primary_key(sourcepath, table)
 
     if primary_key := validators.field_name_in(fields, primary_key):
-        condition: str = f"{primary_key} == {row[primary_key]}"
+        condition: tuple = (primary_key, "==", str(row[primary_key]))
 
         if _row_exists(sourcepath, table, condition):
             raise RowAlreadyExists(row[primary_key])
@@ -57,11 +58,6 @@ def read_rows(
     if not condition:
         return sql_queries.read(sourcepath, table)
 
-    types: dict = sql_queries.fetch_types(sourcepath, table)
-    types = formatters.scourgify_types(types)
-
-    condition = formatters.quote_values(types, condition)
-
     rows: list[dict] = sql_queries.read(sourcepath, table, condition)
 
     if not formatters.depurate_empty_rows(rows):
@@ -70,6 +66,23 @@ def read_rows(
     return rows
 
 
+def read_columns(
+    engine: str, source: str, table: str, condition: tuple | None, size: int
+) -> tuple[dict[str, type], Generator[dict[str, list]]]:
+    """Returns the column types of a table and a generator of column chunks."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    types: dict = sql_queries.fetch_types(sourcepath, table)
+
+    chunks: Generator = sql_queries.read_columns(sourcepath, table, condition, size)
+
+    return formatters.python_types(engine, types), chunks
+
+
 def update_rows(
     engine: str, source: str, table: str, fields: Iterable[tuple], condition: tuple
 ) -> None:
@@ -80,9 +93,6 @@ def update_rows(
 
     # assign types to each row's value
     types: dict = sql_queries.fetch_types(sourcepath, table)
-    types = formatters.scourgify_types(types)
-
-    condition = formatters.quote_values(types, condition)
 
     row: dict = formatters.fields_to_dict(fields)
     row = formatters.assign_types(engine, types, row)
@@ -91,7 +101,7 @@ def update_rows(
     primary_key: str = sql_queries.fetch_primary_key(sourcepath, table)
 
     if primary_key := validators.field_name_in(fields, primary_key):
-        _condition: str = f"{primary_key} == {row[primary_key]}"
+        _condition: tuple = (primary_key, "==", str(row[primary_key]))
 
         if _row_exists(sourcepath, table, _condition):
             raise RowAlreadyExists(row[primary_key])
@@ -113,12 +123,109 @@ def delete_rows(engine: str, source: str, table: str, condition: tuple) -> None:
     if not _row_exists(sourcepath, table, condition):
         raise RowNotFound(condition)
 
+    sql_queries.delete(sourcepath, table, condition)
+
+
+def import_rows(
+    engine: str, source: str, table: str, rows: Iterable[dict], batch_size: int
+) -> Generator[int]:
+    """Inserts a stream of rows in batches, yielding the size of each batch."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    if not sql_queries.table_exists(sourcepath, table):
+        raise TableNotFound(table)
+
+    rows = iter(rows)
+
+    if (first := next(rows, None)) is None:
+        return
+
     types: dict = sql_queries.fetch_types(sourcepath, table)
-    types = formatters.scourgify_types(types)
+    fields, coerce = formatters.compile_row_coercion(engine, types, first.keys())
 
-    condition = formatters.quote_values(types, condition)
+    batches: Iterable[list] = formatters.batch_rows(
+        itertools.chain([first], rows), batch_size
+    )
 
-    sql_queries.delete(sourcepath, table, condition)
+    yield from sql_queries.insert_many(sourcepath, table, fields, map(coerce, batches))
+
+
+def execute_operations(engine: str, source: str, table: str, operation: dict) -> None:
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    types: dict = sql_queries.fetch_types(sourcepath, table)
+
+    inserts, updates, deletes = formatters.unpack_operation(engine, types, operation)
+
+    if keys := operation.get("keys"):
+        sql_queries.execute_keyed(
+            sourcepath,
+            table,
+            keys,
+            inserts,
+            updates,
+            deletes,
+            operation.get("upsert", False),
+        )
+    else:
+        sql_queries.execute(sourcepath, table, inserts, updates, deletes)
+
+
+def capture_changes(engine: str, source: str, table: str) -> bool:
+    """
+    Logs the changes of a table through triggers, returning if they already
+    were, so the log holds every change since the last time it was consumed.
+    """
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if not validators.path_exists(sourcepath):
+        raise SourceNotFound(sourcepath)
+
+    if not sql_queries.table_exists(sourcepath, table):
+        raise TableNotFound(table)
+
+    return sql_changelog.install(sourcepath, table)
+
+
+def release_changes(engine: str, source: str, table: str) -> None:
+    """Stops logging the changes of a table, if they were."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    if validators.path_exists(sourcepath):
+        sql_changelog.uninstall(sourcepath, table)
+
+
+def consume_changes(
+    engine: str, source: str, table: str
+) -> tuple[int, list[dict], list[dict]]:
+    """Returns the last logged change, changed rows and former values of a table."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    return sql_changelog.consume(sourcepath, table)
+
+
+def truncate_changes(engine: str, source: str, table: str, seq: int) -> None:
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    sql_changelog.truncate(sourcepath, table, seq)
+
+
+def fetch_rowid_alias(engine: str, source: str, table: str) -> str:
+    """Returns the column that aliases the rowid of a table, or an empty string."""
+
+    sourcepath: str = formatters.add_folderpath(engine, source)
+
+    return sql_queries.fetch_rowid_alias(sourcepath, table)
 
 
 def drop_table(engine: str, source: str, table: str) -> None:
@@ -136,6 +243,9 @@ def drop_database(engine: str, source: str) -> None:
     if not validators.path_exists(sourcepath):
         raise SourceNotFound(sourcepath)
 
+    sql_connection.close(sourcepath)
+    sql_schema.invalidate(sourcepath)
+    sql_positions.invalidate(sourcepath)
     file_manager.remove_file(sourcepath)
 
 
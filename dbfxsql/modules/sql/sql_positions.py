@@ -0,0 +1,126 @@
+"""Map from the ordinal position of the rows of each table to their rowids"""
+
+import os
+import threading
+from array import array
+from collections.abc import Generator
+from contextlib import contextmanager
+
+from . import sql_connection
+from dbfxsql.helpers import predicates
+
+
+# maps by database path and table: {"version": tuple, "rowids": array}
+_maps: dict[tuple[str, str], dict] = {}
+_lock: threading.Lock = threading.Lock()
+
+
+def fetch_rowids(sourcepath: str, table: str) -> array:
+    """
+    Returns the rowids of a table in the order of its row numbers, scanning
+    them again only after any connection wrote to the database.
+    """
+
+    key: tuple[str, str] = (os.path.abspath(sourcepath), table)
+    version: tuple = sql_connection.fetch_version(sourcepath)
+
+    with _lock:
+        positions: dict | None = _maps.get(key)
+
+    if not positions or version != positions["version"]:
+        positions = {"version": version, "rowids": _fetch_rowids(sourcepath, table)}
+
+        with _lock:
+            _maps[key] = positions
+
+    return positions["rowids"]
+
+
+def resolve(sourcepath: str, table: str, condition: tuple) -> tuple[str, dict]:
+    """
+    Turns a condition over row_number into one over rowid, with the bound
+    rowid as a named parameter, so it runs as a lookup on the table b-tree.
+    """
+
+    _, _operator, value = condition
+
+    predicates.parse_operator(_operator)
+    position: int = predicates.coerce_value("SQL", "row_number", "INTEGER", value)
+
+    rowids: array = fetch_rowids(sourcepath, table)
+
+    # row numbers are 1-based, so the first one past the end is len + 1
+    if _operator in ("<", "<="):
+        index: int = position - 1 if "<" == _operator else position
+        return _bound("<", rowids, min(max(index, 0), len(rowids)))
+
+    if _operator in (">", ">="):
+        index: int = position if ">" == _operator else position - 1
+        return _bound(">=", rowids, min(max(index, 0), len(rowids)))
+
+    if not 1 <= position <= len(rowids):
+        return ("0", {}) if _operator in ("==", "=") else ("1", {})
+
+    equals: str = "=" if _operator in ("==", "=") else "!="
+
+    return f"rowid {equals} :row_position", {"row_position": rowids[position - 1]}
+
+
+@contextmanager
+def preserve(sourcepath: str, table: str, removed: int | None = None) -> Generator:
+    """
+    Keeps the map of a table fresh across a write of dbfxsql that moves no
+    rowid, other than the removed one, as long as no other connection wrote.
+    """
+
+    key: tuple[str, str] = (os.path.abspath(sourcepath), table)
+    version: tuple = sql_connection.fetch_version(sourcepath)
+
+    yield
+
+    current: tuple = sql_connection.fetch_version(sourcepath)
+
+    with _lock:
+        positions: dict | None = _maps.get(key)
+
+        # only the changes counter of the pooled connection may have moved
+        if not positions or version != positions["version"]:
+            return
+
+        if version[:-1] != current[:-1]:
+            return
+
+        if removed is not None:
+            positions["rowids"].remove(removed)
+
+        positions["version"] = current
+
+
+def invalidate(sourcepath: str) -> None:
+    """Forgets the positions of every table in a database."""
+
+    path: str = os.path.abspath(sourcepath)
+
+    with _lock:
+        for key in [key for key in _maps if path == key[0]]:
+            del _maps[key]
+
+
+def _bound(_operator: str, rowids: array, index: int) -> tuple[str, dict]:
+    """Rows before (<) or from (>=) the given index of the map."""
+
+    if index == len(rowids):
+        return ("1", {}) if "<" == _operator else ("0", {})
+
+    return f"rowid {_operator} :row_position", {"row_position": rowids[index]}
+
+
+def _fetch_rowids(sourcepath: str, table: str) -> array:
+    query: str = f"SELECT rowid AS rowid FROM {table} ORDER BY rowid"
+
+    rowids: array = array("q")
+
+    for chunk in sql_connection.fetch_chunks(sourcepath, query, 65_536):
+        rowids.extend(chunk["rowid"])
+
+    return rowids
@@ -1,9 +1,40 @@
 """Database management for the user table"""
 
-from . import sql_connection
+import sqlite3
+from collections.abc import Generator, Iterable, Sequence
+
+from . import sql_connection, sql_positions, sql_schema
+from dbfxsql.helpers import formatters, predicates
+from dbfxsql.exceptions.field_errors import FieldNotFound
+from dbfxsql.exceptions.row_errors import RowAlreadyExists, RowsNotImported
 from dbfxsql.exceptions.table_errors import TableAlreadyExists, TableNotFound
 
 
+# one spelling per comparison, so equal conditions share their statement text
+COMPARISONS: dict[str, str] = {
+    "==": "=",
+    "=": "=",
+    "!=": "!=",
+    "<>": "!=",
+    "<": "<",
+    "<=": "<=",
+    ">": ">",
+    ">=": ">=",
+}
+
+# substrings of a declared type deciding its affinity, in order of precedence
+AFFINITIES: tuple[tuple[str, str], ...] = (
+    ("INT", "INTEGER"),
+    ("CHAR", "TEXT"),
+    ("CLOB", "TEXT"),
+    ("TEXT", "TEXT"),
+    ("BLOB", "BLOB"),
+    ("REAL", "REAL"),
+    ("FLOA", "REAL"),
+    ("DOUB", "REAL"),
+)
+
+
 def create(sourcepath: str, table: str, fields: str) -> None:
     if table_exists(sourcepath, table):
         raise TableAlreadyExists(table)
@@ -11,6 +42,8 @@ def create(sourcepath: str, table: str, fields: str) -> None:
     query: str = f"CREATE TABLE IF NOT EXISTS {table} ({fields})"
     sql_connection.fetch_none(sourcepath, query)
 
+    sql_schema.invalidate(sourcepath)
+
 
 def insert(sourcepath: str, table: str, row: dict, fields: tuple[str, str]) -> None:
     if not table_exists(sourcepath, table):
@@ -28,30 +61,29 @@ def read(sourcepath: str, table: str, condition: tuple | None = None) -> list[di
     if not table_exists(sourcepath, table):
         raise TableNotFound(table)
 
-    query: str = f"SELECT * FROM {table}"
+    query, parameters = _select_query(sourcepath, table, condition)
 
     if condition:
-        query += f" WHERE {"".join(condition)}"
-
         field_name, operator, *_ = condition
         primary_key: str = fetch_primary_key(sourcepath, table)
 
-        if "row_number" == field_name:
-            query = f"""
-            WITH numbered_rows AS (
-                SELECT rowid, ROW_NUMBER() OVER (ORDER BY rowid) AS row_number 
-                FROM {table}
-            )
-            SELECT * FROM {table}
-            WHERE rowid IN (SELECT rowid FROM numbered_rows WHERE {"".join(condition)})
-            """
-
         if "==" == operator and (
             primary_key == field_name or "row_number" == field_name
         ):
-            return sql_connection.fetch_one(sourcepath, query)
+            return sql_connection.fetch_one(sourcepath, query, parameters)
 
-    return sql_connection.fetch_all(sourcepath, query)
+    return sql_connection.fetch_all(sourcepath, query, parameters)
+
+
+def read_columns(
+    sourcepath: str, table: str, condition: tuple | None, size: int
+) -> Generator[dict[str, list]]:
+    if not table_exists(sourcepath, table):
+        raise TableNotFound(table)
+
+    query, parameters = _select_query(sourcepath, table, condition)
+
+    yield from sql_connection.fetch_chunks(sourcepath, query, size, parameters)
 
 
 def update(
@@ -60,45 +92,174 @@ def update(
     if not table_exists(sourcepath, table):
         raise TableNotFound(table)
 
-    query: str = f"UPDATE {table} SET {fields} WHERE {"".join(condition)}"
-    parameters: dict = {**row}
+    where, parameters = _where(sourcepath, table, condition)
 
-    field_name, operator, *_ = condition
+    query: str = f"UPDATE {table} SET {fields} WHERE {where}"
 
-    if "row_number" == field_name:
-        query = f"""
-        WITH numbered_rows AS (
-            SELECT rowid, ROW_NUMBER() OVER (ORDER BY rowid) AS row_number 
-            FROM {table}
-        )
-        UPDATE {table}
-        SET {fields}
-        WHERE rowid IN (SELECT rowid FROM numbered_rows WHERE {"".join(condition)})
-        """
+    # rows keep their rowid unless it's aliased by one of the updated fields
+    if fetch_rowid_alias(sourcepath, table) in row:
+        sql_connection.fetch_none(sourcepath, query, {**row, **parameters})
+        return
 
-    sql_connection.fetch_none(sourcepath, query, parameters)
+    with sql_positions.preserve(sourcepath, table):
+        sql_connection.fetch_none(sourcepath, query, {**row, **parameters})
 
 
 def delete(sourcepath: str, table: str, condition: tuple) -> None:
     if not table_exists(sourcepath, table):
         raise TableNotFound(table)
 
-    query: str = f"DELETE FROM {table} WHERE {"".join(condition)}"
-    field_name, operator, *_ = condition
+    where, parameters = _where(sourcepath, table, condition)
+
+    query: str = f"DELETE FROM {table} WHERE {where}"
+
+    # a single row number removes its rowid from the map
+    if "rowid = :row_position" != where:
+        sql_connection.fetch_none(sourcepath, query, parameters)
+        return
+
+    with sql_positions.preserve(sourcepath, table, parameters["row_position"]):
+        sql_connection.fetch_none(sourcepath, query, parameters)
+
+
+def execute(
+    sourcepath: str,
+    table: str,
+    inserts: list[dict],
+    updates: list[tuple[int, dict]],
+    deletes: list[int],
+) -> None:
+    """Applies a whole batch of row operations inside one transaction."""
+
+    if not table_exists(sourcepath, table):
+        raise TableNotFound(table)
+
+    statements: list[tuple[str, list]] = []
+
+    # positions are resolved before any change shifts them
+    rowids: Sequence[int] = (
+        sql_positions.fetch_rowids(sourcepath, table) if updates or deletes else []
+    )
+
+    if deletes:
+        query: str = f"DELETE FROM {table} WHERE rowid = ?"
+        statements.append((query, [(rowids[index],) for index in deletes]))
+
+    update_groups: dict[tuple, list] = _group_by_fields(
+        (row, {**row, "rowid": rowids[index]}) for index, row in updates
+    )
+    insert_groups: dict[tuple, list] = _group_by_fields((row, row) for row in inserts)
+
+    for fields, rows in update_groups.items():
+        _fields: str = formatters.merge_fields(dict.fromkeys(fields))
 
-    if "row_number" in condition[0]:
-        query = f"""
-        WITH numbered_rows AS (
-            SELECT rowid, ROW_NUMBER() OVER (ORDER BY rowid) AS row_number 
-            FROM {table}
+        query: str = f"UPDATE {table} SET {_fields} WHERE rowid = :rowid"
+        statements.append((query, rows))
+
+    for fields, rows in insert_groups.items():
+        field_names, values = formatters.deglose_fields(dict.fromkeys(fields))
+
+        query: str = f"INSERT INTO {table} ({field_names}) VALUES ({values})"
+        statements.append((query, rows))
+
+    _write_batch(sourcepath, table, statements, inserts)
+
+
+def execute_keyed(
+    sourcepath: str,
+    table: str,
+    keys: list[str],
+    inserts: list[dict],
+    updates: list[tuple[dict, dict]],
+    deletes: list[dict],
+    upsert: bool = False,
+) -> None:
+    """
+    Applies a batch of row operations located by key, in one transaction. An
+    upsert inserts the updated rows whose key isn't found.
+    """
+
+    if not table_exists(sourcepath, table):
+        raise TableNotFound(table)
+
+    create_key_index(sourcepath, table, keys)
+
+    statements: list[tuple[str, list]] = []
+    where: str = " AND ".join(f"{key} = ?" for key in keys)
+
+    if deletes:
+        query: str = f"DELETE FROM {table} WHERE {where}"
+        statements.append((query, [_key_values(keys, key) for key in deletes]))
+
+    update_groups: dict[tuple, list] = _group_by_fields(
+        (row, (*row.values(), *_key_values(keys, key))) for key, row in updates
+    )
+    insert_groups: dict[tuple, list] = _group_by_fields((row, row) for row in inserts)
+
+    for fields, rows in update_groups.items():
+        _fields: str = ", ".join(f"{field} = ?" for field in fields)
+
+        query: str = f"UPDATE {table} SET {_fields} WHERE {where}"
+        statements.append((query, rows))
+
+    if upsert:
+        upserts: list[tuple[dict, dict]] = [
+            ({**key, **row}, key) for key, row in updates
+        ]
+
+        upsert_groups: dict[tuple, list] = _group_by_fields(
+            (row, (*row.values(), *_key_values(keys, key))) for row, key in upserts
         )
-        DELETE FROM {table}
-        WHERE rowid IN (SELECT rowid FROM numbered_rows WHERE {"".join(condition)})
-        """
+
+        for fields, rows in upsert_groups.items():
+            query: str = (
+                f"INSERT INTO {table} ({", ".join(fields)}) "
+                f"SELECT {", ".join("?" * len(fields))} "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE {where})"
+            )
+            statements.append((query, rows))
+
+    for fields, rows in insert_groups.items():
+        field_names, values = formatters.deglose_fields(dict.fromkeys(fields))
+
+        query: str = f"INSERT INTO {table} ({field_names}) VALUES ({values})"
+        statements.append((query, rows))
+
+    _write_batch(sourcepath, table, statements, inserts)
+
+
+def create_key_index(sourcepath: str, table: str, keys: list[str]) -> None:
+    """Indexes the key fields of a table, unless they're its primary key."""
+
+    if [fetch_primary_key(sourcepath, table)] == keys:
+        return
+
+    name: str = "_".join([table, *keys, "key"])
+    query: str = f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(keys)})"
 
     sql_connection.fetch_none(sourcepath, query)
 
 
+def insert_many(
+    sourcepath: str, table: str, fields: list[str], batches: Iterable[list[tuple]]
+) -> Generator[int]:
+    """Inserts batches of rows in one transaction, yielding each batch size."""
+
+    if not table_exists(sourcepath, table):
+        raise TableNotFound(table)
+
+    field_names: str = ", ".join(fields)
+    values: str = ", ".join("?" * len(fields))
+
+    query: str = f"INSERT INTO {table} ({field_names}) VALUES ({values})"
+
+    try:
+        yield from sql_connection.fetch_many(sourcepath, query, batches)
+
+    except sqlite3.IntegrityError as error:
+        raise RowsNotImported(str(error))
+
+
 def drop(sourcepath: str, table: str) -> None:
     if not table_exists(sourcepath, table):
         raise TableNotFound(table)
@@ -106,42 +267,168 @@ def drop(sourcepath: str, table: str) -> None:
     query: str = f"DROP TABLE IF EXISTS {table}"
     sql_connection.fetch_none(sourcepath, query)
 
+    sql_schema.invalidate(sourcepath)
+
 
 def fetch_types(sourcepath: str, table: str) -> dict[str, str]:
-    query: str = f"SELECT name, type FROM pragma_table_info('{table}')"
+    if _table := sql_schema.fetch_tables(sourcepath).get(table):
+        return _table["types"]
 
-    return sql_connection.fetch_all(sourcepath, query)
+    return {}
 
 
 def fetch_primary_key(sourcepath: str, table: str) -> str:
-    query: str = f"SELECT name FROM pragma_table_info('{table}') WHERE pk = 1"
+    if _table := sql_schema.fetch_tables(sourcepath).get(table):
+        return _table["primary_key"]
 
-    primary_key: list | None = sql_connection.fetch_one(sourcepath, query)
-
-    return "" if not primary_key else primary_key[0]["name"]
+    return ""
 
 
 def fetch_row(sourcepath: str, table: str, condition: tuple) -> dict:
     if not table_exists(sourcepath, table):
         raise TableNotFound(table)
 
-    query: str = f"SELECT COUNT(1) FROM {table} WHERE {"".join(condition)}"
-    field_name, operator, *_ = condition
+    where, parameters = _where(sourcepath, table, condition)
+
+    query: str = f"SELECT COUNT(1) FROM {table} WHERE {where}"
+
+    return sql_connection.fetch_one(sourcepath, query, parameters)[0]["COUNT(1)"]
 
-    if "row_number" == field_name:
-        query = f"""
-        WITH numbered_rows AS (
-            SELECT rowid, ROW_NUMBER() OVER (ORDER BY rowid) AS row_number
-            FROM {table}
-        )
-        SELECT COUNT(1) FROM {table}
-        WHERE rowid IN (SELECT rowid FROM numbered_rows WHERE {"".join(condition)})
-        """
 
-    return sql_connection.fetch_one(sourcepath, query)[0]["COUNT(1)"]
+def fetch_rowid_alias(sourcepath: str, table: str) -> str:
+    primary_key: str = fetch_primary_key(sourcepath, table)
+
+    if "INTEGER" == fetch_types(sourcepath, table).get(primary_key, "").upper():
+        return primary_key
+
+    return ""
 
 
 def table_exists(sourcepath: str, table: str) -> bool:
-    query = f"SELECT COUNT(1) FROM sqlite_master WHERE type='table' AND name='{table}'"
+    return table in sql_schema.fetch_tables(sourcepath)
+
+
+def _key_values(keys: list[str], key: dict) -> tuple:
+    return tuple(key[field] for field in keys)
+
+
+def _select_query(
+    sourcepath: str, table: str, condition: tuple | None
+) -> tuple[str, dict]:
+    if not condition:
+        return f"SELECT * FROM {table}", {}
+
+    where, parameters = _where(sourcepath, table, condition)
+
+    return f"SELECT * FROM {table} WHERE {where}", parameters
+
+
+def _where(sourcepath: str, table: str, condition: tuple) -> tuple[str, dict]:
+    """
+    Builds the clause of a condition with its value bound as a named parameter
+    of the type of the field, resolving row numbers to rowids.
+    """
+
+    field, _operator, value = condition
+
+    if "row_number" == field:
+        return sql_positions.resolve(sourcepath, table, condition)
+
+    types: dict[str, str] = fetch_types(sourcepath, table)
+
+    # identifiers of SQLite ignore case, so fields are matched the same way
+    names: dict[str, str] = {name.lower(): name for name in types}
+
+    if (name := names.get(field.lower())) is None:
+        raise FieldNotFound(field)
+
+    predicates.parse_operator(_operator)
+
+    if affinity := _affinity(types[name]):
+        literal: any = predicates.coerce_value("SQL", name, affinity, value)
+    else:
+        literal = _untyped(value)
+
+    where: str = f"{name} {COMPARISONS[_operator]} :condition_value"
+
+    return where, {"condition_value": literal}
+
+
+def _group_by_fields(rows: Iterable[tuple[dict, any]]) -> dict[tuple, list]:
+    """
+    Groups the parameters of rows by the fields they write, so rows sharing
+    the same fields run as a single statement.
+    """
+
+    groups: dict[tuple, list] = {}
+
+    for row, parameters in rows:
+        groups.setdefault(tuple(row), []).append(parameters)
+
+    return groups
+
+
+def _write_batch(
+    sourcepath: str, table: str, statements: list[tuple[str, list]], inserts: list[dict]
+) -> None:
+    """
+    Runs the statements of a batch, reporting a write that breaks a constraint
+    as the inserted row whose primary key is taken, when that's the cause.
+    """
+
+    try:
+        sql_connection.fetch_batch(sourcepath, statements)
+
+    except sqlite3.IntegrityError as error:
+        if (key := _taken_key(sourcepath, table, inserts)) is not None:
+            raise RowAlreadyExists(key)
+
+        raise RowsNotImported(str(error))
+
+
+def _taken_key(sourcepath: str, table: str, rows: list[dict]) -> any:
+    """First primary key of some rows that repeats or is already in the table."""
+
+    if not (primary_key := fetch_primary_key(sourcepath, table)):
+        return None
+
+    seen: set = set()
+
+    for row in rows:
+        if (key := row.get(primary_key)) is None:
+            continue
+
+        if key in seen or fetch_row(sourcepath, table, (primary_key, "==", str(key))):
+            return key
+
+        seen.add(key)
+
+    return None
+
+
+def _affinity(_type: str) -> str:
+    """
+    Resolves a declared type to its column affinity, as SQLite does, or to an
+    empty string when the column has none declared.
+    """
+
+    _type = _type.upper()
+
+    for substring, affinity in AFFINITIES:
+        if substring in _type:
+            return affinity
+
+    return "NUMERIC" if _type else ""
+
+
+def _untyped(value: str) -> int | float | str:
+    """
+    Binds a literal of a column without a declared type, which stores values
+    as given, as a number when it reads as one and as text otherwise.
+    """
+
+    try:
+        return predicates.parse_number(value)
 
-    return bool(sql_connection.fetch_one(sourcepath, query)[0]["COUNT(1)"])
+    except ValueError:
+        return value
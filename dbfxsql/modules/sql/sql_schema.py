@@ -0,0 +1,73 @@
+"""Catalog of the tables, column types and primary keys of each database"""
+
+import os
+import threading
+
+from . import sql_connection
+from dbfxsql.helpers import formatters
+
+
+# catalogs by database path: {"version": int, "tables": {table: {...}}}
+_catalogs: dict[str, dict] = {}
+_lock: threading.Lock = threading.Lock()
+
+
+def fetch_tables(sourcepath: str) -> dict[str, dict]:
+    """
+    Returns the types and primary key of every table in a database, loading
+    them again only when the schema version of the database changed.
+    """
+
+    key: str = os.path.abspath(sourcepath)
+    version: int = _fetch_version(sourcepath)
+
+    with _lock:
+        catalog: dict | None = _catalogs.get(key)
+
+        if not catalog or version != catalog["version"]:
+            catalog = {"version": version, "tables": _fetch_tables(sourcepath)}
+            _catalogs[key] = catalog
+
+    return catalog["tables"]
+
+
+def invalidate(sourcepath: str) -> None:
+    """Forgets the catalog of a database after changing its schema."""
+
+    with _lock:
+        _catalogs.pop(os.path.abspath(sourcepath), None)
+
+
+def _fetch_version(sourcepath: str) -> int:
+    query: str = "PRAGMA schema_version"
+
+    return sql_connection.fetch_one(sourcepath, query)[0]["schema_version"]
+
+
+def _fetch_tables(sourcepath: str) -> dict[str, dict]:
+    query: str = """
+    SELECT master.name AS tbl_name, info.name, info.type, info.pk
+    FROM sqlite_master AS master, pragma_table_info(master.name) AS info
+    WHERE master.type = 'table'
+    ORDER BY master.name, info.cid
+    """
+
+    tables: dict[str, dict] = {}
+    columns: list[dict] = formatters.depurate_empty_rows(
+        sql_connection.fetch_all(sourcepath, query)
+    )
+
+    for column in columns:
+        table: dict = tables.setdefault(
+            column["tbl_name"], {"types": [], "primary_key": ""}
+        )
+
+        table["types"].append(column)
+
+        if 1 == column["pk"]:
+            table["primary_key"] = column["name"]
+
+    for table in tables.values():
+        table["types"] = formatters.scourgify_types(table["types"])
+
+    return tables
@@ -1,36 +1,52 @@
 from dbfxsql.modules import dbf_controller, sql_controller
 
 
-def insert(engine: str, source: str, table: str, fields: tuple) -> None:
+def read(engine: str, source: str, table: str) -> dict:
     if "DBF" == engine.upper():
-        dbf_controller.insert_row(engine, source, fields)
+        return dbf_controller.read_rows(engine, source, condition=None)
 
-    else:
-        sql_controller.insert_row(engine, source, table, fields)
+    return sql_controller.read_rows(engine, source, table, condition=None)
 
 
-def read(engine: str, source: str, table: str) -> dict:
+def execute(engine: str, source: str, table: str, operation: dict) -> None:
     if "DBF" == engine.upper():
-        return dbf_controller.read_rows(engine, source, condition=None)
+        dbf_controller.execute_operations(engine, source, operation)
 
-    return sql_controller.read_rows(engine, source, table, condition=None)
+    else:
+        sql_controller.execute_operations(engine, source, table, operation)
 
 
-def update(engine: str, source: str, table: str, fields: tuple, index: int) -> None:
-    condition: tuple = ("row_number", "==", f"{index + 1}")
+def keeps_positions(engine: str, source: str, table: str, fields: list[str]) -> bool:
+    """
+    Tells if written rows keep their position, which doesn't hold when SQLite
+    orders them by a rowid alias among the synced fields.
+    """
 
     if "DBF" == engine.upper():
-        dbf_controller.update_rows(engine, source, fields, condition)
+        return True
 
-    else:
-        sql_controller.update_rows(engine, source, table, fields, condition)
+    return sql_controller.fetch_rowid_alias(engine, source, table) not in fields
 
 
-def delete(engine: str, source: str, table: str, index: int) -> None:
-    condition: tuple = ("row_number", "==", f"{index + 1}")
+def capture(engine: str, source: str, table: str, enabled: bool) -> bool:
+    """
+    Logs the changes of a SQL table when enabled, telling if the log already
+    holds every change since it was last consumed.
+    """
 
     if "DBF" == engine.upper():
-        dbf_controller.delete_rows(engine, source, condition)
+        return False
 
-    else:
-        sql_controller.delete_rows(engine, source, table, condition)
+    if not enabled:
+        sql_controller.release_changes(engine, source, table)
+        return False
+
+    return sql_controller.capture_changes(engine, source, table)
+
+
+def consume(engine: str, source: str, table: str) -> tuple[int, list[dict], list[dict]]:
+    return sql_controller.consume_changes(engine, source, table)
+
+
+def truncate(engine: str, source: str, table: str, seq: int) -> None:
+    sql_controller.truncate_changes(engine, source, table, seq)
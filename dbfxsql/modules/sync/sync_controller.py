@@ -1,12 +1,34 @@
+import asyncio
+import atexit
 import logging
-from collections.abc import AsyncGenerator
+import multiprocessing
+import os
+import sys
+import threading
+from array import array
+from collections.abc import AsyncGenerator, Callable, Generator, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
 
-from . import sync_connection
+from . import sync_connection, sync_state
+from .sync_scheduler import EventScheduler
+from dbfxsql.constants import config
+from dbfxsql.models.sync_state import SyncState
 from dbfxsql.models.sync_table import SyncTable
 from dbfxsql.helpers import file_manager, formatters, utils
 
 from watchfiles import awatch
 
+# stamps left by the last write of dbfxsql on each source
+_echoes: dict[str, str] = {}
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock: threading.Lock = threading.Lock()
+
+# sources being migrated, so concurrent migrations never share a file
+_file_locks: dict[str, threading.Lock] = {}
+_file_locks_lock: threading.Lock = threading.Lock()
+
 
 def init() -> dict:
     logging.getLogger("watchfiles").setLevel(logging.ERROR)
@@ -24,27 +46,306 @@ def collect_files(setup: dict, priority: str) -> tuple:
 def migrate(filenames: list, relations: dict) -> None:
     changes: list[dict] = formatters.package_changes(filenames, relations)
 
-    for tables in changes:
-        origin: SyncTable = _assing_rows([tables["origin"]])[0]
-        destinies: list[SyncTable] = _assing_rows(tables["destinies"])
+    # changes sharing no source run apart, each group in its own worker
+    groups: list[dict] = _group_changes(changes)
+    workers: int = min(_workers(), len(groups))
+
+    paths: set[str] = set().union(*(group["paths"] for group in groups))
+
+    with _lock_files(paths):
+        if workers <= 1:
+            for group in groups:
+                _echoes.update(_migrate_group(group["changes"]))
 
-        residual_tables: list = formatters.compare_tables(origin, destinies)
-        operations: list = formatters.classify_operations(residual_tables)
+            return
 
-        # Operations to be executed in the correspond source
-        # utils.notify(operations, destinies)
+        tasks: list[list[dict]] = [group["changes"] for group in groups]
 
-        _execute_operations(operations, destinies)
+        for echoes, error in _get_pool().map(_run_group, tasks):
+            _echoes.update(echoes)
 
+            if error:
+                sys.exit(error)
 
-async def synchronize(setup: dict, priority: str) -> None:
+
+async def synchronize(
+    setup: dict, priority: str, report: Callable[[dict], None] | None = None
+) -> None:
     folders: list[str] = list(
         set(path for folder in setup["folderpaths"].values() for path in folder)
     )
     relations: list[dict] = setup["relations"]
 
-    async for filenames in _listen(folders):
-        migrate(filenames, relations)
+    settings: dict = {**config.SYNC, **setup.get("sync", {})}
+    scheduler: EventScheduler = EventScheduler(float(settings["quiet_period"]))
+
+    listener: asyncio.Task = asyncio.create_task(_schedule(scheduler, folders))
+
+    try:
+        while True:
+            # echoes are told apart once the previous migration is over
+            filenames: list[str] = [
+                name
+                for name in await scheduler.ready()
+                if file_manager.find_relations(name) and not _is_echo(name)
+            ]
+
+            if filenames:
+                # the watcher keeps queueing changes while migrating
+                await asyncio.to_thread(migrate, filenames, relations)
+
+            if report:
+                report(scheduler.stats())
+    finally:
+        listener.cancel()
+
+
+def _migrate_group(changes: list[dict]) -> dict[str, str]:
+    """Migrates changes in order, returning the stamps left by its writes."""
+
+    echoes: dict[str, str] = {}
+
+    for tables in changes:
+        origin: SyncTable = tables["origin"]
+        destinies: list[SyncTable] = tables["destinies"]
+
+        # stamps are taken before reading, so a write in between isn't missed
+        origin_stamp: str = sync_state.stamp(origin)
+        destiny_stamps: list[str] = [sync_state.stamp(table) for table in destinies]
+
+        states: list = [
+            sync_state.load(origin, fields, destiny)
+            for fields, destiny in zip(origin.fields, destinies)
+        ]
+
+        pending: list[int] = [
+            index
+            for index, state in enumerate(states)
+            if not state
+            or (origin_stamp, destiny_stamps[index])
+            != (state.origin_stamp, state.destiny_stamp)
+        ]
+
+        if not pending:
+            continue
+
+        logged: tuple | None = _capture_changes(origin, destinies)
+
+        # logged changes stand for the origin rows of keyed destinies that
+        # didn't change since their last sync
+        captured: list[int] = [
+            index
+            for index in pending
+            if logged
+            and destinies[index].keys
+            and states[index]
+            and destiny_stamps[index] == states[index].destiny_stamp
+        ]
+
+        if len(captured) < len(pending):
+            origin = _assing_rows([origin])[0]
+
+        for index in pending:
+            destiny: SyncTable = destinies[index]
+            stamps: tuple = (origin_stamp, destiny_stamps[index])
+
+            if destiny.keys:
+                echo: str = _migrate_keyed(
+                    origin,
+                    origin.fields[index],
+                    origin.keys[index],
+                    destiny,
+                    stamps,
+                    logged if index in captured else None,
+                )
+            else:
+                echo: str = _migrate_table(
+                    origin, origin.fields[index], destiny, states[index], stamps
+                )
+
+            if echo:
+                echoes[destiny.source] = echo
+
+        # every destiny is synced past the consumed changes
+        if logged and logged[0]:
+            sync_connection.truncate(
+                origin.engine, origin.source, origin.name, logged[0]
+            )
+            echoes[origin.source] = sync_state.stamp(origin)
+
+    return echoes
+
+
+def _run_group(changes: list[dict]) -> tuple[dict[str, str], str]:
+    """Migrates a group inside a worker process, handing back its errors."""
+
+    try:
+        return _migrate_group(changes), ""
+    except SystemExit as error:
+        return {}, str(error.code)
+
+
+def _group_changes(changes: list[dict]) -> list[dict]:
+    """
+    Splits the changes into groups that share no source between them, each
+    one keeping its changes in their original order.
+    """
+
+    groups: list[dict] = []
+
+    for position, tables in enumerate(changes):
+        paths: set[str] = {
+            os.path.abspath(formatters.add_folderpath(table.engine, table.source))
+            for table in [tables["origin"], *tables["destinies"]]
+        }
+
+        linked: list[dict] = [group for group in groups if group["paths"] & paths]
+        groups = [group for group in groups if group not in linked]
+
+        groups.append(
+            {
+                "paths": paths.union(*(group["paths"] for group in linked)),
+                "positions": sorted(
+                    index for group in linked for index in group["positions"]
+                )
+                + [position],
+            }
+        )
+
+    return [
+        {
+            "paths": group["paths"],
+            "changes": [changes[index] for index in group["positions"]],
+        }
+        for group in groups
+    ]
+
+
+def _workers() -> int:
+    """Number of parallel migrations, where zero stands for one per core."""
+
+    settings: dict = {**config.SYNC, **file_manager.load_config().get("sync", {})}
+
+    return int(settings["workers"]) or os.cpu_count() or 1
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if not _pool:
+            # spawned workers don't inherit the threads and connections
+            _pool = ProcessPoolExecutor(
+                _workers(), mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_pool.shutdown)
+
+    return _pool
+
+
+@contextmanager
+def _lock_files(paths: set[str]) -> Generator[None]:
+    """Holds the lock of every file, always taken in the same order."""
+
+    with _file_locks_lock:
+        locks: list[threading.Lock] = [
+            _file_locks.setdefault(path, threading.Lock()) for path in sorted(paths)
+        ]
+
+    with ExitStack() as stack:
+        for lock in locks:
+            stack.enter_context(lock)
+
+        yield
+
+
+def _migrate_table(
+    origin: SyncTable,
+    origin_fields: list,
+    destiny: SyncTable,
+    state: SyncState | None,
+    stamps: tuple,
+) -> str:
+    """
+    Syncs a destiny from its origin, reading the destiny only when it changed
+    since the fingerprints of its rows were saved. Returns the stamp left by
+    writing the destiny, or an empty string if nothing was written.
+    """
+
+    origin_stamp, destiny_stamp = stamps
+    fields: list[str] = formatters.mapped_fields((origin_fields, destiny.fields))[1]
+
+    if state and destiny_stamp == state.destiny_stamp:
+        fingerprints: Iterable = state.fingerprints
+    else:
+        destiny = _assing_rows([destiny])[0]
+        fingerprints = formatters.fingerprint_rows(destiny.rows, fields)
+
+    residual_table: tuple = formatters.compare_fingerprints(
+        origin, origin_fields, destiny, fingerprints
+    )
+    operation: dict = formatters.classify_operations([residual_table])[0]
+
+    written: bool = any(operation[key] for key in ("insert", "update", "delete"))
+
+    if written:
+        _execute_operations([operation], [destiny])
+
+        destiny_stamp = sync_state.stamp(destiny)
+
+        if sync_connection.keeps_positions(
+            destiny.engine, destiny.source, destiny.name, fields
+        ):
+            fingerprints = sync_state.apply_operation(fingerprints, operation, fields)
+        else:
+            destiny = _assing_rows([destiny])[0]
+            fingerprints = formatters.fingerprint_rows(destiny.rows, fields)
+
+    state = SyncState(origin_stamp, destiny_stamp, fingerprints)
+    sync_state.save(origin, origin_fields, destiny, state)
+
+    return destiny_stamp if written else ""
+
+
+def _migrate_keyed(
+    origin: SyncTable,
+    origin_fields: list,
+    origin_keys: list,
+    destiny: SyncTable,
+    stamps: tuple,
+    logged: tuple | None = None,
+) -> str:
+    """
+    Syncs a destiny from its origin matching their rows by key, so each change
+    is written as a point operation on its key. Given the changes logged in
+    the origin, only those are written, without reading the destiny. Returns
+    the stamp left by writing the destiny, or an empty string if nothing was
+    written.
+    """
+
+    origin_stamp, destiny_stamp = stamps
+
+    if logged:
+        operation: dict = formatters.classify_changes(
+            logged, origin_fields, origin_keys, destiny
+        )
+    else:
+        destiny = _assing_rows([destiny])[0]
+        operation: dict = formatters.classify_by_keys(
+            origin, origin_fields, origin_keys, destiny
+        )
+
+    written: bool = any(operation[key] for key in ("insert", "update", "delete"))
+
+    if written:
+        _execute_operations([operation], [destiny])
+        destiny_stamp = sync_state.stamp(destiny)
+
+    # keyed relations are only skipped by their stamps, without fingerprints
+    state = SyncState(origin_stamp, destiny_stamp, array("Q"))
+    sync_state.save(origin, origin_fields, destiny, state)
+
+    return destiny_stamp if written else ""
 
 
 def _assing_rows(tables: list[SyncTable]) -> list[SyncTable]:
@@ -59,6 +360,7 @@ def _assing_rows(tables: list[SyncTable]) -> list[SyncTable]:
             name=table.name,
             fields=table.fields,
             rows=formatters.depurate_empty_rows(rows),
+            keys=table.keys,
         )
 
         _table.append(destiny)
@@ -68,30 +370,51 @@ def _assing_rows(tables: list[SyncTable]) -> list[SyncTable]:
 
 def _execute_operations(operations: list, destinies: list[SyncTable]) -> None:
     for operation, destiny in zip(operations, destinies):
-        for insert in operation["insert"]:
-            sync_connection.insert(
-                destiny.engine,
-                destiny.source,
-                destiny.name,
-                formatters.fields_to_tuple(insert["fields"]),
+        if operation["insert"] or operation["update"] or operation["delete"]:
+            sync_connection.execute(
+                destiny.engine, destiny.source, destiny.name, operation
             )
 
-        for update in operation["update"]:
-            sync_connection.update(
-                destiny.engine,
-                destiny.source,
-                destiny.name,
-                formatters.fields_to_tuple(update["fields"]),
-                update["index"],
-            )
 
-        for delete in operation["delete"][::-1]:
-            sync_connection.delete(
-                destiny.engine,
-                destiny.source,
-                destiny.name,
-                delete["index"],
-            )
+def _capture_changes(origin: SyncTable, destinies: list[SyncTable]) -> tuple | None:
+    """
+    Consumes the changes logged in a SQL origin of keyed destinies, or returns
+    None while they don't hold every change yet, like right after the triggers
+    logging them were installed.
+    """
+
+    settings: dict = {**config.SYNC, **file_manager.load_config().get("sync", {})}
+    enabled: bool = bool(settings["capture"]) and any(table.keys for table in destinies)
+
+    if not sync_connection.capture(origin.engine, origin.source, origin.name, enabled):
+        return None
+
+    return sync_connection.consume(origin.engine, origin.source, origin.name)
+
+
+def _is_echo(filename: str) -> bool:
+    """
+    Tells if the last change of a file was written by dbfxsql itself, since
+    its stamp still matches the one left by that write.
+    """
+
+    if not (echo := _echoes.get(filename)):
+        return False
+
+    _, extension = formatters.decompose_filename(filename)
+    engine: str = file_manager.find_engine(extension)
+
+    if echo == sync_state.stamp_file(formatters.add_folderpath(engine, filename)):
+        return True
+
+    del _echoes[filename]
+
+    return False
+
+
+async def _schedule(scheduler: EventScheduler, folders: list[str]) -> None:
+    async for filenames in _listen(folders):
+        scheduler.push(filenames)
 
 
 async def _listen(folders: tuple[str]) -> AsyncGenerator[tuple, None]:
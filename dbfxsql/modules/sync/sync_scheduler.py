@@ -0,0 +1,93 @@
+"""Coalescing of the watched changes before migrating them"""
+
+import asyncio
+import time
+from collections.abc import Iterable
+
+
+class EventScheduler:
+    """
+    Holds the changed files until they stay quiet for a while, so a burst of
+    writes on the same file ends up in a single migration.
+    """
+
+    def __init__(self, quiet_period: float) -> None:
+        self.quiet_period: float = quiet_period
+
+        # first and last time each pending file was seen changing
+        self._pending: dict[str, list[float]] = {}
+        self._wakeup: asyncio.Event = asyncio.Event()
+
+        self._stats: dict[str, float] = {
+            "events": 0,
+            "coalesced": 0,
+            "released": 0,
+            "depth": 0,
+            "max_depth": 0,
+            "lag": 0.0,
+            "max_lag": 0.0,
+        }
+
+    def push(self, filenames: Iterable[str]) -> None:
+        """Queues changed files, merging them with the ones still pending."""
+
+        now: float = time.monotonic()
+
+        for filename in filenames:
+            self._stats["events"] += 1
+
+            if seen := self._pending.get(filename):
+                self._stats["coalesced"] += 1
+                seen[1] = now
+            else:
+                self._pending[filename] = [now, now]
+
+        self._update_depth()
+        self._wakeup.set()
+
+    async def ready(self) -> list[str]:
+        """Waits for pending files to go quiet and releases them."""
+
+        while True:
+            now: float = time.monotonic()
+            timeout: float | None = None
+
+            if released := [
+                filename
+                for filename, (_, last) in self._pending.items()
+                if now - last >= self.quiet_period
+            ]:
+                return self._release(released, now)
+
+            if self._pending:
+                timeout = min(
+                    last + self.quiet_period - now for _, last in self._pending.values()
+                )
+
+            self._wakeup.clear()
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    def stats(self) -> dict[str, float]:
+        """Returns the queue depth, the lag until release and event counters."""
+
+        return dict(self._stats)
+
+    def _release(self, filenames: list[str], now: float) -> list[str]:
+        for filename in filenames:
+            first, _ = self._pending.pop(filename)
+
+            self._stats["lag"] = now - first
+            self._stats["max_lag"] = max(self._stats["max_lag"], now - first)
+
+        self._stats["released"] += len(filenames)
+        self._update_depth()
+
+        return filenames
+
+    def _update_depth(self) -> None:
+        self._stats["depth"] = len(self._pending)
+        self._stats["max_depth"] = max(self._stats["max_depth"], len(self._pending))
@@ -0,0 +1,137 @@
+"""Fingerprints of the synced tables, persisted between runs"""
+
+import json
+import os
+import threading
+from array import array
+from pathlib import Path
+
+from dbfxsql.constants import config
+from dbfxsql.helpers import formatters
+from dbfxsql.models.sync_state import SyncState
+from dbfxsql.models.sync_table import SyncTable
+from dbfxsql.modules.sql import sql_connection
+
+HEADER_SIZE: int = 32
+
+_ready: set[str] = set()
+_lock: threading.Lock = threading.Lock()
+
+
+def stamp(table: SyncTable) -> str:
+    """
+    Identifies the current version of a source by its mtime, size and header,
+    where DBF keeps its record count and SQLite its change counter.
+    """
+
+    return stamp_file(formatters.add_folderpath(table.engine, table.source))
+
+
+def stamp_file(sourcepath: str) -> str:
+    """Stamp of the source found at a path, or an empty string if missing."""
+
+    try:
+        with open(sourcepath, "rb") as file:
+            stat: os.stat_result = os.fstat(file.fileno())
+            header: bytes = file.read(HEADER_SIZE)
+    except FileNotFoundError:
+        return ""
+
+    return f"{stat.st_mtime_ns}:{stat.st_size}:{header.hex()}"
+
+
+def load(origin: SyncTable, origin_fields: list, destiny: SyncTable) -> SyncState | None:
+    """Returns the state of a relation saved by the last sync, if any."""
+
+    query: str = """
+    SELECT origin_stamp, destiny_stamp, hashes FROM fingerprints WHERE relation = ?
+    """
+
+    statepath: str = _statepath()
+    relation: str = _relation_key(origin, origin_fields, destiny)
+
+    if not (rows := sql_connection.fetch_one(statepath, query, (relation,))):
+        return None
+
+    fingerprints: array = array("Q")
+    fingerprints.frombytes(rows[0]["hashes"])
+
+    return SyncState(rows[0]["origin_stamp"], rows[0]["destiny_stamp"], fingerprints)
+
+
+def save(
+    origin: SyncTable, origin_fields: list, destiny: SyncTable, state: SyncState
+) -> None:
+    """Keeps the state of a relation until the next sync."""
+
+    query: str = "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?)"
+
+    parameters: tuple = (
+        _relation_key(origin, origin_fields, destiny),
+        state.origin_stamp,
+        state.destiny_stamp,
+        len(state.fingerprints),
+        array("Q", state.fingerprints).tobytes(),
+    )
+
+    sql_connection.fetch_none(_statepath(), query, parameters)
+
+
+def apply_operation(fingerprints: array, operation: dict, fields: list[str]) -> list:
+    """
+    Follows the positions of the destiny rows through an operation: updates
+    in place, deletes shift the rows after them and inserts are appended.
+    """
+
+    hashes: list[int] = list(fingerprints)
+
+    updates: list[dict] = [row["fields"] for row in operation["update"]]
+    inserts: list[dict] = [row["fields"] for row in operation["insert"]]
+
+    for row, fingerprint in zip(
+        operation["update"], formatters.fingerprint_rows(updates, fields)
+    ):
+        hashes[row["index"]] = fingerprint
+
+    if deletes := {row["index"] for row in operation["delete"]}:
+        hashes = [value for index, value in enumerate(hashes) if index not in deletes]
+
+    hashes.extend(formatters.fingerprint_rows(inserts, fields))
+
+    return hashes
+
+
+def _statepath() -> str:
+    statepath: Path = Path(config.STATE_PATH).expanduser()
+
+    with _lock:
+        if str(statepath) not in _ready:
+            statepath.parent.mkdir(parents=True, exist_ok=True)
+
+            query: str = """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                relation TEXT PRIMARY KEY,
+                origin_stamp TEXT NOT NULL,
+                destiny_stamp TEXT NOT NULL,
+                records INTEGER NOT NULL,
+                hashes BLOB NOT NULL
+            )
+            """
+
+            sql_connection.fetch_none(str(statepath), query)
+            _ready.add(str(statepath))
+
+    return str(statepath)
+
+
+def _relation_key(origin: SyncTable, origin_fields: list, destiny: SyncTable) -> str:
+    members: list = [
+        [os.path.abspath(formatters.add_folderpath(table.engine, table.source))]
+        + [table.name, fields]
+        for table, fields in ((origin, origin_fields), (destiny, destiny.fields))
+    ]
+
+    if destiny.keys:
+        members.append(destiny.keys)
+
+    return json.dumps(members)
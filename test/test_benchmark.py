@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmark import results
+
+
+def test_compare_flags_regressions() -> None:
+    base: dict = {"results": {"crud.sql": {"read": {"p50_ms": 1.0, "ops_per_s": 900}}}}
+    head: dict = {"results": {"crud.sql": {"read": {"p50_ms": 1.5, "ops_per_s": 1000}}}}
+
+    rows: list[dict] = results.compare(base, head, 0.1)
+
+    assert [row["metric"] for row in rows if row["regression"]] == [
+        "crud.sql.read.p50_ms"
+    ]
+
+
+def test_run_and_compare(tmp_path) -> None:
+    output: str = str(tmp_path / "base.json")
+    environment: dict = {**os.environ, "HOME": str(tmp_path)}
+
+    run: list[str] = ["run", "-w", "crud.sql", "-r", "50", "-n", "10"]
+    run += ["-d", str(tmp_path), "-o", output]
+
+    subprocess.run(
+        [sys.executable, "-m", "benchmark", *run], env=environment, check=True
+    )
+
+    with open(output) as file:
+        report: dict = json.load(file)
+
+    assert report["meta"]["parameters"]["rows"] == 50
+    assert report["results"]["crud.sql"]["read"]["count"] == 10
+
+    compare = subprocess.run(
+        [sys.executable, "-m", "benchmark", "compare", output, output],
+        env=environment,
+        capture_output=True,
+    )
+
+    assert compare.returncode == 0
@@ -1,10 +1,20 @@
 # Warning: Theses tests only works with the default config file.
 
+import datetime
 import os
 import subprocess
 
+import dbf
+
 from dbfxsql.constants import sample_commands
-from dbfxsql.helpers import validators
+from dbfxsql.helpers import predicates, validators
+from dbfxsql.modules.dbf import (
+    dbf_connection,
+    dbf_index,
+    dbf_queries,
+    dbf_reader,
+    dbf_records,
+)
 
 
 def test_create_table() -> None:
@@ -75,3 +85,161 @@ def test_drop_table() -> None:
     os.system(sample_commands.DBF["drop"] + " --yes")
 
     assert not validators.path_exists("./users.dbf")
+
+
+def test_mapped_table(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "types.dbf")
+    fields: str = "name C(10); age N(3,0); pay Y; born D; seen T; ok L; rate B"
+
+    table: dbf.Table = dbf.Table(sourcepath, fields, dbf_type="vfp")
+
+    with table.open(dbf.READ_WRITE):
+        table.append(
+            {
+                "name": "John",
+                "age": 30,
+                "pay": 12.5,
+                "born": datetime.date(1990, 1, 2),
+                "seen": datetime.datetime(2020, 3, 4, 5, 6, 7),
+                "ok": True,
+                "rate": 0.25,
+            }
+        )
+        table.append()
+        dbf.delete(table[0])
+        table.append({"name": "Jane", "age": 25})
+
+    with table.open(dbf.READ_ONLY):
+        field_names: list[str] = [field.lower() for field in table.field_names]
+        expected: list[dict] = [
+            dbf_queries._scourgify(field_names, row)
+            for row in table
+            if not dbf.is_deleted(row)
+        ]
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        assert list(mapped.rows()) == expected
+        assert mapped.record(0) is None
+
+
+def test_table_cache(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "cache.dbf")
+
+    open(sourcepath, "w").close()
+    dbf_queries.create(sourcepath, "name C(10)")
+
+    with dbf_connection.get_table(sourcepath) as table:
+        cached: dbf.Table = table
+
+    with dbf_connection.get_table(sourcepath) as table:
+        assert table is cached
+
+        with dbf_connection.get_table(sourcepath) as nested:
+            assert nested is not table
+
+    # a write from outside the cache invalidates it
+    with dbf.Table(sourcepath).open(dbf.READ_WRITE) as table:
+        table.append({"name": "John"})
+
+    with dbf_connection.get_table(sourcepath) as table:
+        assert table is not cached
+        assert 1 == len(table)
+
+
+def test_indexed_lookups(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "users.dbf")
+
+    open(sourcepath, "w").close()
+    dbf_queries.create(sourcepath, "id N(5,0); name C(10)")
+
+    for id in (3, 1, 2, 1):
+        dbf_queries.insert(sourcepath, {"id": id, "name": f"user{id}"})
+
+    assert 4 == dbf_index.build(sourcepath, "id")
+
+    # writes of dbfxsql keep the index valid
+    dbf_queries.insert(sourcepath, {"id": 0, "name": "user0"})
+    dbf_queries.delete(sourcepath, [1])
+
+    matches: list[tuple] = dbf_queries.read_indexed(sourcepath, "id", "==", 1)
+    assert [index for index, _ in matches] == [2]
+
+    matches = dbf_queries.read_indexed(sourcepath, "id", "<=", 2)
+    assert [row["id"] for _, row in matches] == [2, 1, 0]
+
+    assert dbf_queries.read_indexed(sourcepath, "name", "==", "user1") is None
+
+
+def test_patched_index(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "scores.dbf")
+
+    open(sourcepath, "w").close()
+    dbf_queries.create(sourcepath, "score N(5,0)")
+    dbf_queries.execute(sourcepath, [{"score": score} for score in range(100)], [], [])
+
+    assert 100 == dbf_index.build(sourcepath, "score")
+
+    # a batch small enough to be patched into the index rather than rebuilt
+    updates: list[tuple[int, dict]] = [(10, {"score": 500}), (20, {"score": -1})]
+    dbf_queries.execute(sourcepath, [{"score": 50}], updates, [30, 40], 1.0)
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        expected: list[int] = list(dbf_index._sort(mapped, "score"))
+
+    assert list(dbf_index._load(sourcepath, "score")) == expected
+    assert {30, 40}.isdisjoint(expected)
+
+    matches: list[tuple] = dbf_queries.read_indexed(sourcepath, "score", "==", 50)
+    assert [row["score"] for _, row in matches] == [50, 50]
+
+
+def test_fractional_conditions(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "prices.dbf")
+
+    open(sourcepath, "w").close()
+    dbf_queries.create(sourcepath, "price N(8,2)")
+    prices: list[dict] = [{"price": price} for price in (1.1, 2, 1.1)]
+    dbf_queries.execute(sourcepath, prices, [], [])
+
+    types: dict[str, str] = dbf_queries.fetch_types(sourcepath)
+    predicate = predicates.compile_condition("DBF", types, ("price", "==", "1.1"))
+
+    with dbf_reader.open_table(sourcepath) as mapped:
+        assert 2 == sum(map(predicate, mapped.rows()))
+
+    assert 2 == sum(map(predicate, dbf_queries.read(sourcepath)))
+
+    predicate = predicates.compile_condition("DBF", types, ("price", ">=", "2"))
+    assert 1 == sum(map(predicate, dbf_queries.read(sourcepath)))
+
+    dbf_index.build(sourcepath, "price")
+    literal: any = predicates.coerce_value("DBF", "price", types["price"], "1.1")
+
+    assert 2 == len(dbf_queries.read_indexed(sourcepath, "price", "==", literal))
+
+
+def test_deleted_cache(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "flags.dbf")
+
+    open(sourcepath, "w").close()
+    dbf_queries.create(sourcepath, "id N(5,0)")
+    dbf_queries.execute(sourcepath, [{"id": id} for id in range(5)], [], [])
+
+    assert [] == dbf_records.fetch_deleted(sourcepath)
+    assert dbf_records.fetch_deleted(sourcepath) is dbf_records.fetch_deleted(
+        sourcepath
+    )
+
+    # a write to the file is seen by the next lookup
+    dbf_queries.delete(sourcepath, [1, 3], 1.0)
+
+    assert [1, 3] == dbf_records.fetch_deleted(sourcepath)
+    assert {"id": 4} == dbf_queries.read_record(sourcepath, 2)
+
+    dbf_index.build(sourcepath, "id")
+
+    matches: list[tuple] = dbf_queries.read_indexed(sourcepath, "id", ">", 0)
+    assert [index for index, _ in matches] == [1, 2]
+
+    matches = dbf_queries.read_indexed(sourcepath, "id", ">", 0, indexed=False)
+    assert [(index, row["id"]) for index, row in matches] == [(None, 2), (None, 4)]
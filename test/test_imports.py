@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+
+# modules only the DBF engine, the watcher or the spinners need
+DEFERRED: tuple[str, ...] = ("dbf", "watchfiles", "yaspin", "asyncio")
+
+# times importing the CLI and the SQL controller may take over importing click
+# alone, measured on the same machine: ~4x when every command imported all of
+# the engines and ~2x since
+RATIO: float = 3.5
+RUNS: int = 3
+
+
+def test_import_budget(tmp_path) -> None:
+    statement: str = "import dbfxsql.cli; from dbfxsql.modules import sql_controller"
+    environment: dict = {**os.environ, "PYTHONPYCACHEPREFIX": str(tmp_path)}
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    # the first run compiles the bytecode the measured ones import
+    loaded, _ = _import_time(statement, environment)
+
+    assert not loaded.intersection(DEFERRED)
+
+    # the fastest of a few runs leaves out most of the noise of a busy machine
+    elapsed: int = min(_import_time(statement, environment)[1] for _ in range(RUNS))
+    baseline: int = min(
+        _import_time("import click", environment)[1] for _ in range(RUNS)
+    )
+
+    assert elapsed < baseline * RATIO
+
+
+def _import_time(statement: str, environment: dict) -> tuple[set[str], int]:
+    """Modules loaded by a statement and the microseconds it took to import them."""
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    loaded: set[str] = set()
+    elapsed: int = 0
+
+    for line in process.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        loaded.add(name.strip())
+
+        # the nested imports are already counted by the ones that made them
+        if not name.startswith("  "):
+            elapsed += int(cumulative)
+
+    return loaded, elapsed
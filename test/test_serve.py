@@ -0,0 +1,82 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+
+from dbfxsql.modules.serve import serve_connection, serve_controller
+
+
+def test_serve_commands(tmp_path, monkeypatch) -> None:
+    environment: dict = {**os.environ, "HOME": str(tmp_path)}
+    socketpath: str = str(tmp_path / ".config" / "DBFxSQL" / "server.sock")
+
+    server = subprocess.Popen(["dbfxsql", "serve"], env=environment, cwd=tmp_path)
+
+    try:
+        for _ in range(100):
+            if os.path.exists(socketpath):
+                break
+
+            time.sleep(0.1)
+
+        monkeypatch.chdir(tmp_path)
+
+        create: list[str] = ["create", "-s", "users.dbf", "-f", "id", "N(5,0)"]
+        insert: list[str] = ["insert", "-s", "users.dbf", "-f", "id", "7"]
+        read: list[str] = ["read", "-s", "users.dbf", "-c", "id", "=="]
+
+        assert serve_controller.forward(socketpath, create)["status"] == 0
+        assert serve_controller.forward(socketpath, insert)["status"] == 0
+
+        assert "| 7  |" in serve_controller.forward(socketpath, [*read, "7"])["stdout"]
+        assert serve_controller.forward(socketpath, [*read, "8"]) == {
+            "status": 1,
+            "stdout": "",
+            "stderr": "Error: Row not found with: id==8\n",
+        }
+        assert serve_controller.forward(socketpath, ["sync"]) is None
+
+        # exports to stdout run in the client, which streams them
+        export: list[str] = ["read", "-s", "users.dbf", "-F", "csv"]
+
+        assert serve_controller.forward(socketpath, export) is None
+        assert serve_controller.forward(socketpath, [*export, "-o", "u.csv"]) == {
+            "status": 0,
+            "stdout": "",
+            "stderr": "",
+        }
+        assert os.path.exists(tmp_path / "u.csv")
+
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=10)
+
+    assert not os.path.exists(socketpath)
+
+
+def test_stalled_client(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(serve_connection, "TIMEOUT", 0.1)
+    socketpath: str = str(tmp_path / "echo.sock")
+
+    def echo(connection) -> None:
+        serve_connection.send(connection, serve_connection.receive(connection))
+
+    with serve_connection.listen(socketpath, echo) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        # a client that never sends is dropped instead of blocking the next
+        stalled = serve_connection.connect(socketpath)
+
+        try:
+            with serve_connection.connect(socketpath) as connection:
+                connection.settimeout(5)
+                serve_connection.send(connection, {"args": ["read"]})
+
+                assert serve_connection.receive(connection) == {"args": ["read"]}
+
+        finally:
+            stalled.close()
+            server.shutdown()
+            thread.join()
@@ -3,9 +3,12 @@
 import os
 import subprocess
 
+import pytest
+
 from dbfxsql.constants import sample_commands
+from dbfxsql.exceptions.row_errors import RowAlreadyExists
 from dbfxsql.helpers import formatters, validators
-from dbfxsql.modules.sql import sql_queries
+from dbfxsql.modules.sql import sql_connection, sql_positions, sql_queries
 
 
 def test_create_table() -> None:
@@ -83,3 +86,99 @@ def test_drop_database() -> None:
     os.system(sample_commands.SQL["drop_database"] + " --yes")
 
     assert not validators.path_exists("./company.sql")
+
+
+def test_coerce_imported_rows() -> None:
+    types: dict[str, str] = {"id": "INTEGER", "name": "TEXT"}
+    rows: list[dict] = [{"ID": "1", "name": "John Doe"}, {"ID": "", "name": "Jane"}]
+
+    fields, coerce = formatters.compile_row_coercion("SQL", types, ["ID", "name"])
+
+    assert fields == ["id", "name"]
+    assert coerce(rows) == [(1, "John Doe"), (None, "Jane")]
+
+
+def test_resolve_row_numbers(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "positions.sql")
+
+    sql_connection.fetch_none(sourcepath, "CREATE TABLE users (id INTEGER PRIMARY KEY)")
+    sql_connection.fetch_batch(
+        sourcepath, [("INSERT INTO users VALUES (?)", [(3,), (7,), (9,)])]
+    )
+
+    assert sql_positions.resolve(sourcepath, "users", ("row_number", "==", "2")) == (
+        "rowid = :row_position",
+        {"row_position": 7},
+    )
+    assert sql_positions.resolve(sourcepath, "users", ("row_number", ">", "3")) == (
+        "0",
+        {},
+    )
+
+    sql_connection.close(sourcepath)
+
+
+def test_bind_conditions(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "conditions.sql")
+
+    sql_connection.fetch_none(
+        sourcepath, "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(20))"
+    )
+    sql_connection.fetch_batch(
+        sourcepath, [("INSERT INTO users VALUES (?, ?)", [(1, "O'Neil"), (2, "10")])]
+    )
+
+    assert sql_queries._where(sourcepath, "users", ("id", "==", "2")) == (
+        "id = :condition_value",
+        {"condition_value": 2},
+    )
+    assert sql_queries.read(sourcepath, "users", ("name", "=", "O'Neil")) == [
+        {"id": 1, "name": "O'Neil"}
+    ]
+    assert sql_queries.fetch_row(sourcepath, "users", ("name", "<>", "10")) == 1
+
+    sql_connection.close(sourcepath)
+
+
+def test_loose_conditions(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "loose.sql")
+
+    sql_connection.fetch_none(sourcepath, "CREATE TABLE items (a, Name TEXT)")
+    sql_connection.fetch_batch(
+        sourcepath, [("INSERT INTO items VALUES (?, ?)", [(5, "x"), ("y", "z")])]
+    )
+
+    # columns without a type compare as the values were stored
+    assert sql_queries.read(sourcepath, "items", ("a", "==", "5")) == [
+        {"a": 5, "Name": "x"}
+    ]
+    assert sql_queries.fetch_row(sourcepath, "items", ("a", "==", "y")) == 1
+
+    # and fields are found whatever their case
+    assert sql_queries.fetch_row(sourcepath, "items", ("name", "==", "z")) == 1
+
+    sql_connection.close(sourcepath)
+
+
+def test_taken_keys(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "taken.sql")
+
+    sql_connection.fetch_none(
+        sourcepath, "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)"
+    )
+    sql_queries.execute(sourcepath, "users", [{"id": 1, "name": "a"}], [], [])
+
+    # batches breaking the primary key report it instead of the SQLite error
+    with pytest.raises(SystemExit) as error:
+        sql_queries.execute(sourcepath, "users", [{"id": 2}, {"id": 2}], [], [])
+
+    assert isinstance(error.value.code, RowAlreadyExists)
+    assert "id: 2" in str(error.value.code)
+
+    with pytest.raises(SystemExit) as error:
+        sql_queries.execute_keyed(sourcepath, "users", ["id"], [{"id": 1}], [], [])
+
+    assert "id: 1" in str(error.value.code)
+    assert sql_queries.fetch_row(sourcepath, "users", ("id", "==", "2")) == 0
+
+    sql_connection.close(sourcepath)
@@ -0,0 +1,206 @@
+import asyncio
+from dataclasses import asdict
+
+from dbfxsql.exceptions.row_errors import RowAlreadyExists
+from dbfxsql.helpers import formatters
+from dbfxsql.modules.sql import sql_changelog, sql_connection
+from dbfxsql.modules.sync import sync_controller, sync_state
+from dbfxsql.modules.sync.sync_scheduler import EventScheduler
+from dbfxsql.models.sync_table import SyncTable
+
+
+def _tables(origin_rows: list[dict], destiny_rows: list[dict]) -> tuple:
+    origin: SyncTable = SyncTable("DBF", "users.dbf", "", [["id", "name"]], origin_rows)
+    destiny: SyncTable = SyncTable("SQL", "company.sql", "users", ["id", "name"], destiny_rows)
+
+    return origin, [destiny]
+
+
+def test_compare_equal_tables() -> None:
+    rows: list[dict] = [{"id": 1, "name": "John Doe"}, {"id": 2, "name": "Jane Doe"}]
+    origin, destinies = _tables(rows, rows[::-1])
+
+    residual_tables: list = formatters.compare_tables(origin, destinies)
+
+    assert residual_tables == [([], [])]
+
+
+def test_compare_duplicated_rows() -> None:
+    origin_rows: list[dict] = [{"id": 1, "name": "John Doe"}] * 3
+    destiny_rows: list[dict] = [{"id": 1, "name": "John Doe"}] * 2
+    origin, destinies = _tables(origin_rows, destiny_rows)
+
+    residual_origin, residual_destiny = formatters.compare_tables(origin, destinies)[0]
+
+    assert [row["index"] for row in residual_origin] == [2]
+    assert residual_destiny == []
+
+
+def test_classify_operations() -> None:
+    origin_rows: list[dict] = [
+        {"id": 1, "name": "John Doe"},
+        {"id": 2, "name": "Jane Doe"},
+        {"id": 3, "name": "Jim Doe"},
+    ]
+    destiny_rows: list[dict] = [
+        {"id": 1, "name": "John Doe"},
+        {"id": 2, "name": "Jane Smith"},
+    ]
+    origin, destinies = _tables(origin_rows, destiny_rows)
+
+    residual_tables: list = formatters.compare_tables(origin, destinies)
+    operation: dict = formatters.classify_operations(residual_tables)[0]
+
+    assert operation["update"] == [{"index": 1, "fields": origin_rows[1]}]
+    assert operation["insert"] == [{"fields": origin_rows[2]}]
+    assert operation["delete"] == []
+
+
+def test_compare_fingerprints() -> None:
+    origin_rows: list[dict] = [{"id": 1, "name": "John Doe"}, {"id": 3, "name": "Jim"}]
+    destiny_rows: list[dict] = [{"id": 1.0, "name": "John Doe"}, {"id": 2, "name": "X"}]
+    origin, destinies = _tables(origin_rows, destiny_rows)
+
+    fingerprints: list[int] = formatters.fingerprint_rows(destiny_rows, ["id", "name"])
+    residual_table: tuple = formatters.compare_fingerprints(
+        origin, origin.fields[0], destinies[0], fingerprints
+    )
+
+    assert residual_table[0] == formatters.compare_tables(origin, destinies)[0][0]
+    assert [row["index"] for row in residual_table[1]] == [1]
+
+
+def test_apply_operation() -> None:
+    fields: list[str] = ["id", "name"]
+    rows: list[dict] = [{"id": index, "name": f"Doe {index}"} for index in range(4)]
+
+    operation: dict = {
+        "insert": [{"fields": {"id": 5, "name": "Doe 5"}}],
+        "update": [{"index": 1, "fields": {"id": 4, "name": "Doe 4"}}],
+        "delete": [{"index": 2}],
+    }
+    expected: list[dict] = [rows[0], {"id": 4, "name": "Doe 4"}, rows[3]]
+    expected.append({"id": 5, "name": "Doe 5"})
+
+    fingerprints: list = sync_state.apply_operation(
+        formatters.fingerprint_rows(rows, fields), operation, fields
+    )
+
+    assert fingerprints == formatters.fingerprint_rows(expected, fields)
+
+
+def test_scheduler_coalesces_events() -> None:
+    async def burst() -> tuple:
+        scheduler: EventScheduler = EventScheduler(quiet_period=0.05)
+
+        for _ in range(10):
+            scheduler.push(["users.dbf"])
+
+        scheduler.push(["company.sql"])
+
+        return await scheduler.ready(), scheduler.stats()
+
+    filenames, stats = asyncio.run(burst())
+
+    assert filenames == ["users.dbf", "company.sql"]
+    assert 9 == stats["coalesced"] and 0 == stats["depth"]
+
+
+def test_classify_by_keys() -> None:
+    origin_rows: list[dict] = [
+        {"id": 2, "name": "Jane Doe"},
+        {"id": 1, "name": "John Doe"},
+        {"id": 3, "name": "Jim Doe"},
+    ]
+    destiny_rows: list[dict] = [
+        {"id": 1, "name": "John Doe"},
+        {"id": 2, "name": "Jane Smith"},
+        {"id": 4, "name": "Joe Doe"},
+    ]
+    origin, destinies = _tables(origin_rows, destiny_rows)
+    destiny: SyncTable = SyncTable(**{**asdict(destinies[0]), "keys": ["id"]})
+
+    operation: dict = formatters.classify_by_keys(origin, ["id", "name"], ["id"], destiny)
+
+    assert operation["update"] == [{"key": {"id": 2}, "fields": origin_rows[0]}]
+    assert operation["insert"] == [{"fields": origin_rows[2]}]
+    assert operation["delete"] == [{"key": {"id": 4}}]
+
+
+def test_classify_changes(tmp_path) -> None:
+    sourcepath: str = str(tmp_path / "company.sql")
+
+    sql_connection.fetch_none(sourcepath, "CREATE TABLE users (id, name)")
+    sql_connection.fetch_none(sourcepath, "INSERT INTO users VALUES (1, 'John Doe')")
+    sql_changelog.install(sourcepath, "users")
+
+    sql_connection.fetch_batch(
+        sourcepath,
+        [
+            ("INSERT INTO users VALUES (?, ?)", [(2, "Jane Doe")]),
+            ("UPDATE users SET id = ? WHERE id = ?", [(3, 1)]),
+        ],
+    )
+
+    changes: tuple = sql_changelog.consume(sourcepath, "users")
+    _, destinies = _tables([], [])
+    destiny: SyncTable = SyncTable(**{**asdict(destinies[0]), "keys": ["id"]})
+
+    operation: dict = formatters.classify_changes(
+        changes, ["id", "name"], ["id"], destiny
+    )
+
+    assert operation["update"] == [
+        {"key": {"id": 3}, "fields": {"id": 3, "name": "John Doe"}},
+        {"key": {"id": 2}, "fields": {"id": 2, "name": "Jane Doe"}},
+    ]
+    assert operation["delete"] == [{"key": {"id": 1}}]
+
+    sql_changelog.truncate(sourcepath, "users", changes[0])
+
+    assert sql_changelog.consume(sourcepath, "users") == (0, [], [])
+
+    sql_connection.fetch_none(sourcepath, "DELETE FROM users WHERE id = 2")
+    sql_changelog.uninstall(sourcepath, "users")
+
+    assert not sql_changelog.install(sourcepath, "users")
+    assert sql_changelog.consume(sourcepath, "users") == (0, [], [])
+
+    sql_connection.close(sourcepath)
+
+
+def test_group_changes() -> None:
+    def change(origin: str, *destinies: str) -> dict:
+        return {
+            "origin": SyncTable("DBF", origin, "", []),
+            "destinies": [SyncTable("DBF", source, "", []) for source in destinies],
+        }
+
+    changes: list[dict] = [
+        change("a.dbf", "b.dbf"),
+        change("c.dbf", "d.dbf"),
+        change("e.dbf", "f.dbf"),
+        change("b.dbf", "g.dbf"),
+        # links the first two groups, directly and through the one above
+        change("g.dbf", "d.dbf"),
+    ]
+
+    groups: list[dict] = sync_controller._group_changes(changes)
+
+    assert [group["changes"] for group in groups] == [
+        [changes[2]],
+        [changes[0], changes[1], changes[3], changes[4]],
+    ]
+    assert len(groups[1]["paths"]) == 5
+
+
+def test_run_group_errors(monkeypatch) -> None:
+    def migrate_group(changes: list[dict]) -> dict:
+        raise RowAlreadyExists(1)
+
+    monkeypatch.setattr(sync_controller, "_migrate_group", migrate_group)
+
+    assert sync_controller._run_group([]) == (
+        {},
+        "Error: Row already exists with id: 1",
+    )